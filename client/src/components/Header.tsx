@@ -33,6 +33,7 @@ const Header = () => {
   const { user, isAuthenticated, logout, isRole } = useUser();
   const [showDropdown, setShowDropdown] = useState(false);
   const [notifications, setNotifications] = useState<NotificationType[]>([]);
+  const [unreadCount, setUnreadCount] = useState(0);
 
   type NotificationType = {
   id: number;
@@ -50,6 +51,7 @@ const handleMarkAllRead = async () => {
     await fetch(`${API_BASE}/api/notifications/${user.id}/mark-all-read`, {
       method: "PATCH",
     });
+    setUnreadCount(0);
     fetchNotifications(); // ✅ Refresh local state
   } catch (error) {
     console.error("Failed to mark notifications as read:", error);
@@ -68,8 +70,63 @@ const fetchNotifications = async () => {
   }
 };
 
+// The badge reads the maintained counter; the list loads when the dropdown opens
+const fetchUnreadCount = async () => {
+  if (!user?.id) return;
+  try {
+    const res = await fetch(`${API_BASE}/api/notifications/${user.id}/unread-count`);
+    if (!res.ok) return;
+    const data = await res.json();
+    setUnreadCount(data.unread_count);
+  } catch (err) {
+    console.error("Failed to load unread count:", err);
+  }
+};
+
+// New notifications are pushed over SSE; the count is re-read on every (re)connect
 useEffect(() => {
-  fetchNotifications();
+  if (!user?.id) return;
+  const token = localStorage.getItem("access_token");
+  if (!token) return;
+
+  let source: EventSource | null = null;
+  let retry: ReturnType<typeof setTimeout> | undefined;
+  let stopped = false;
+
+  // EventSource can't send headers, so the URL carries a short-lived stream-only token
+  const connect = async () => {
+    try {
+      const res = await fetch(`${API_BASE}/api/notifications/stream-token`, {
+        method: "POST",
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      if (!res.ok || stopped) return;
+      const { token: streamToken } = await res.json();
+
+      source = new EventSource(`${API_BASE}/api/notifications/stream?jwt=${encodeURIComponent(streamToken)}`);
+      source.onopen = () => fetchUnreadCount();
+      source.addEventListener("notification", (event) => {
+        const notif: NotificationType = JSON.parse((event as MessageEvent).data);
+        setNotifications((prev) => [notif, ...prev.filter((n) => n.id !== notif.id)]);
+        setUnreadCount((count) => count + 1);
+      });
+      // The browser retries with the same URL; once that token has expired it gives up, so get a new one
+      source.onerror = () => {
+        if (source?.readyState === EventSource.CLOSED && !stopped) {
+          retry = setTimeout(connect, 5000);
+        }
+      };
+    } catch (err) {
+      console.error("Failed to open notification stream:", err);
+    }
+  };
+  connect();
+
+  return () => {
+    stopped = true;
+    clearTimeout(retry);
+    source?.close();
+  };
 }, [user?.id]);
   // Function to navigate and scroll to top
   const handleNavigate = (path: string) => {
@@ -191,7 +248,7 @@ const renderNavigationLinks = () => {
       title="Notifications"
     >
       <BellIcon className="w-5 h-5" />
-      {notifications.some(n => !n.read) && (
+      {unreadCount > 0 && (
         <span className="absolute top-0 right-0 inline-flex items-center justify-center w-2 h-2 bg-red-500 rounded-full" />
       )}
     </button>
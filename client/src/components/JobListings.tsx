@@ -9,7 +9,7 @@ import { Label } from "@/components/ui/label";
 import { useToast } from "@/hooks/use-toast";
 import { getResumeData } from "@/utils/resumeUtils";
 import { useUser } from "@/contexts/UserContext";
-import { getAppliedJobs } from "@/utils/jobUtils";
+import { getAppliedJobs, searchJobs } from "@/utils/jobUtils";
 import { useLocation } from "wouter";
 import { API_BASE } from '../config';
 
@@ -104,25 +104,50 @@ const normalizeType = (val: string | null | undefined) =>
     fetchSavedJobs();
   }, [user]);
 
+const PAGE_SIZE = fullPage ? 24 : 6;
+const [nextCursor, setNextCursor] = useState<string | null>(null);
+
+const mapJob = (job: any) => ({
+  ...job,
+  type: job.type || job.job_type || "", // ✅ Ensure 'type' is always defined
+  postedDate: job.posted_date ?? job.postedDate,
+  skills: Array.isArray(job.skills)
+    ? job.skills
+    : typeof job.skills === "string"
+      ? job.skills.split(",").map((s: string) => s.trim())
+      : [],
+});
+
+// Fetch one page of jobs; the server returns an opaque cursor for the next page
+const fetchJobsPage = async (cursor?: string | null) => {
+  const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+  if (cursor) params.set("cursor", cursor);
+  if (localFilters.skills.length > 0) {
+    params.set("skills", localFilters.skills.join(","));
+    params.set("skills_match", "all");
+  }
+
+  const response = await fetch(`${API_BASE}/api/jobs?${params.toString()}`);
+  const data = await response.json();
+
+  setNextCursor(data.next_cursor ?? null);
+  return (data.jobs || []).map(mapJob);
+};
+
 useEffect(() => {
+  const query = localFilters.search.trim();
+
   const fetchJobs = async () => {
     try {
-      const response = await fetch(`${API_BASE}/api/jobs`);
-      const data = await response.json();
-
-      const mapped = data.map((job: any) => {
-        return {
-          ...job,
-          type: job.type || job.job_type || "", // ✅ Ensure 'type' is always defined
-          postedDate: job.posted_date,
-          skills: Array.isArray(job.skills)
-            ? job.skills
-            : typeof job.skills === "string"
-              ? job.skills.split(",").map((s: string) => s.trim())
-              : [],
-        };
-      });
-
+      let mapped;
+      if (query) {
+        // Server-side ranked search; results come back best match first
+        const data = await searchJobs(query, 0, PAGE_SIZE);
+        setNextCursor(null);
+        mapped = (data.jobs || []).map(mapJob);
+      } else {
+        mapped = await fetchJobsPage();
+      }
       setAllJobs(mapped);
       setFilteredJobs(mapped);
     } catch (error) {
@@ -130,8 +155,9 @@ useEffect(() => {
     }
   };
 
-  fetchJobs();
-}, []);
+  const timer = setTimeout(fetchJobs, query ? 300 : 0);
+  return () => clearTimeout(timer);
+}, [localFilters.search, localFilters.skills.join(",")]);
 
 
 
@@ -192,18 +218,7 @@ useEffect(() => {
     );
   }
 
-  // Search Filter
-  if (localFilters.search) {
-    const searchLower = safeLower(localFilters.search);
-    result = result.filter(job =>
-      safeLower(job.title).includes(searchLower) ||
-      safeLower(job.company).includes(searchLower) ||
-      safeLower(job.location).includes(searchLower) ||
-      (Array.isArray(job.skills) ? job.skills : []).some(skill =>
-        safeLower(skill).includes(searchLower)
-      )
-    );
-  }
+  // Search text is matched server-side by /api/jobs/search (see fetchJobs above)
 
   // Skills Filter
   if (localFilters.skills.length > 0) {
@@ -217,8 +232,8 @@ useEffect(() => {
     );
   }
 
-  // Sort by Most Recent
-  result.sort((a, b) => {
+  // Sort by Most Recent (search results keep their relevance order)
+  if (!localFilters.search) result.sort((a, b) => {
     if (a.postedDate && b.postedDate) {
       return new Date(b.postedDate).getTime() - new Date(a.postedDate).getTime();
     }
@@ -329,12 +344,21 @@ const handleApply = async (jobId: number) => {
 };
 
 
-  const handleLoadMore = () => {
+  const handleLoadMore = async () => {
+    if (!nextCursor) {
+      toast({ description: "All available jobs have been loaded" });
+      return;
+    }
+
     setLoadingMore(true);
-    setTimeout(() => {
+    try {
+      const more = await fetchJobsPage(nextCursor);
+      setAllJobs(prev => [...prev, ...more]);
+    } catch (error) {
+      console.error("Error fetching more jobs:", error);
+    } finally {
       setLoadingMore(false);
-      toast({ description: "All available jobs have been loaded" });
-    }, 1000);
+    }
   };
 
   const displayedJobs = fullPage ? filteredJobs : filteredJobs.slice(0, 6);
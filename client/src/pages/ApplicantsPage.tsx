@@ -8,29 +8,38 @@ const ApplicantsPage = () => {
   const [match, params] = useRoute("/employer/job/:jobId/applicants");
   const jobId = params?.jobId;
   const [applicants, setApplicants] = useState<Applicant[]>([]);
+  const [sort, setSort] = useState<"applied" | "match">("applied");
+  const [nextOffset, setNextOffset] = useState<number | null>(null);
 
 
   interface Applicant {
   id: number;
   name: string;
   email: string;
-  resume_snapshot: {
-    cv_url?: string;
-  };
+  applied_at: string;
+  cv_url?: string | null;
+  snapshot_digest: string;
+  match_score?: number | null;
 }
 
 
+  const loadApplicants = (offset = 0) => {
+    const params = new URLSearchParams({ offset: String(offset) });
+    if (sort === "match") params.set("sort", "match");
+
+    fetch(apiUrl(`/api/jobs/${jobId}/applicants?${params.toString()}`))
+      .then((res) => res.json())
+      .then((data) => {
+        setApplicants((prev) => (offset === 0 ? data.applicants : [...prev, ...data.applicants]));
+        setNextOffset(data.next_offset ?? null);
+      })
+      .catch((err) => console.error("Error loading applicants", err));
+  };
+
   useEffect(() => {
   if (!jobId) return;
-
-  fetch(apiUrl(`/api/jobs/${jobId}/applicants`))
-    .then((res) => res.json())
-    .then((data) => {
-      console.log("Applicants response:", data); // 👈 check this
-      setApplicants(data);
-    })
-    .catch((err) => console.error("Error loading applicants", err));
-}, [jobId]);
+  loadApplicants(0);
+}, [jobId, sort]);
 
 
   if (!match) {
@@ -42,6 +51,18 @@ const ApplicantsPage = () => {
       <div className="container max-w-3xl mx-auto">
         <h1 className="text-3xl font-bold mb-6">Applicants for Job #{jobId}</h1>
 
+        <div className="flex gap-2 mb-6">
+          <Button variant={sort === "applied" ? "default" : "outline"} size="sm" onClick={() => setSort("applied")}>
+            Most recent
+          </Button>
+          <Button variant={sort === "match" ? "default" : "outline"} size="sm" onClick={() => setSort("match")}>
+            Best match
+          </Button>
+          <Button variant="outline" size="sm" className="ml-auto" asChild>
+            <a href={apiUrl(`/api/jobs/${jobId}/applicants/export?format=csv`)}>Export CSV</a>
+          </Button>
+        </div>
+
         {applicants.length === 0 ? (
           <p>No applicants found.</p>
         ) : (
@@ -51,32 +72,42 @@ const ApplicantsPage = () => {
                 <CardContent className="p-4">
                   <h2 className="text-lg font-semibold">{applicant.name}</h2>
                   <p>Email: {applicant.email}</p>
+                  {sort === "match" && applicant.match_score != null && (
+                    <p className="text-sm text-gray-600">Match: {Math.round(applicant.match_score * 100)}%</p>
+                  )}
                 <p className="flex items-center gap-2 mt-2">
                   CV:
                   <Button
                     variant="outline"
                     size="sm"
-                    onClick={() => window.open(applicant.resume_snapshot?.cv_url, '_blank')}
-                    disabled={!applicant.resume_snapshot?.cv_url}
+                    onClick={() => window.open(applicant.cv_url ?? undefined, '_blank')}
+                    disabled={!applicant.cv_url}
                   >
                     Preview
                   </Button>
 
 
                   <a
-                    href={applicant.resume_snapshot?.cv_url}
+                    href={applicant.cv_url ?? undefined}
                     download
                     target="_blank"
                     rel="noopener noreferrer"
                   >
                   </a>
-                  {!applicant.resume_snapshot?.cv_url && (
+                  {!applicant.cv_url && (
     <span className="text-sm text-red-500 ml-2">No resume uploaded</span>
       )}
                 </p>
                 </CardContent>
               </Card>
             ))}
+            {nextOffset !== null && (
+              <div className="text-center">
+                <Button variant="outline" onClick={() => loadApplicants(nextOffset)}>
+                  Load more
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -158,6 +158,8 @@ const handleChangePassword = async () => {
     const data = await res.json();
 
     if (res.ok) {
+      // Changing the password signs out other sessions; keep this one going
+      if (data.access_token) localStorage.setItem('access_token', data.access_token);
       toast({
         title: "Password Updated",
         description: "Your new password has been saved.",
@@ -63,12 +63,30 @@ const handleResumeUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
         body: formData,
       });
 
-      const data = await res.json();
+      let data = await res.json();
       if (!res.ok) {
         setUploadError(data.error || "Upload failed");
         return;
       }
 
+      // Parsing runs in the background; poll the job until it finishes
+      while (data.status === "queued" || data.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 1500));
+        const poll = await fetch(apiUrl(`/api/upload-resume/${data.job_id}`), {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        data = await poll.json();
+        if (!poll.ok) {
+          setUploadError(data.error || "Upload failed");
+          return;
+        }
+      }
+
+      if (data.status === "failed") {
+        setUploadError(data.error || "Resume parsing failed");
+        return;
+      }
+
       setCvValidated(true);
       if (data.cv_url) {
       setResumeUrl(data.cv_url); // ✅ Match backend key
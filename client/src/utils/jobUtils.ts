@@ -10,6 +10,14 @@ export const getAppliedJobs = async (jobSeekerId: number) => {
 
 
 
+// Ranked full-text search over title, description, requirements, skills and company name
+export const searchJobs = async (query: string, offset = 0, limit = 24) => {
+  const params = new URLSearchParams({ q: query, offset: String(offset), limit: String(limit) });
+  const res = await fetch(`${API_BASE}/api/jobs/search?${params.toString()}`);
+  if (!res.ok) throw new Error("Failed to search jobs");
+  return await res.json();
+};
+
 export const saveJob = async (seekerId: number, jobId: number) => {
   const res = await fetch(`${API_BASE}/api/job-seeker/${seekerId}/save/${jobId}`, {
     method: 'POST',
@@ -13,8 +13,26 @@ load_dotenv()
 db = SQLAlchemy()
 jwt = JWTManager()
 
+def background_workers_enabled(app):
+    """
+    Whether create_app should start schedulers and worker threads. One-off
+    CLI commands (`flask drain-outbox`, migrations, ...) run inside a click
+    context and must not start them; `flask run` serves, so it does.
+    """
+    setting = app.config.get("BACKGROUND_WORKERS", "auto")
+    if app.config.get("TESTING") or setting == "false":
+        return False
+    if setting == "true":
+        return True
+
+    import click
+    ctx = click.get_current_context(silent=True)
+    return ctx is None or ctx.info_name == "run"
+
+
 def create_app():
-    app = Flask(__name__, static_url_path='/uploads', static_folder=os.path.join(os.getcwd(), 'uploads'))
+    # Uploads are served by uploaded_file below, not Flask's static route
+    app = Flask(__name__, static_folder=None)
 
     # Load config
     from app.config import Config
@@ -38,21 +56,105 @@ def create_app():
 
     # create tables automatically in development
     with app.app_context():
-        from app.models import User, JobSeeker, Employer, Admin, Job, Application, Resume, SavedJob, Report, Notification, PendingUser
+        from app.models import User, JobSeeker, Employer, Admin, Job, Application, Resume, SavedJob, Report, Notification, NotificationArchive, PendingUser, Skill, ResumeSnapshot, EmailOutbox, DigestRun, ResumeParseJob, ParsedResume, StoredBlob, BlobRef, RateLimitBucket
+        from sqlalchemy import inspect
+        existing_tables = set(inspect(db.engine).get_table_names())
         db.create_all()
+
+        from app.schema import add_missing_columns, create_missing_indexes, relax_not_null
+        added_columns = add_missing_columns(db)
+        for column in added_columns:
+            print(f"➕ Added column {column}")
+        for index in create_missing_indexes(db):
+            print(f"📇 Created index {index}")
+        for column in relax_not_null(db):
+            print(f"➖ Dropped NOT NULL on {column}")
+
+        # Derived data for tables and columns that were just added to an existing database
+        from app.counters import backfill_counters
+        for counter in backfill_counters(added_columns):
+            print(f"🔢 Rebuilt counter {counter}")
+        from app.skills import backfill_new_skill_tables
+        backfilled = backfill_new_skill_tables(existing_tables)
+        if backfilled:
+            print(f"🏷️ Filled skill tables for {backfilled[0]} job(s) and {backfilled[1]} job seeker(s)")
+
+        from app.search import ensure_search_index
+        if ensure_search_index():
+            print("🔎 Created the job search index")
         print("✅ All tables created!")
 
 
     jwt.init_app(app)
+    from app.auth import tokens  # noqa: F401 -- registers the token revocation check
+
+    # Password hashing pool saturated: shed load instead of queueing requests behind it
+    from app.passwords import PasswordHashingBusy
+
+    @app.errorhandler(PasswordHashingBusy)
+    def password_hashing_busy(e):
+        response = jsonify({"message": "The server is busy, please try again in a moment."})
+        response.headers["Retry-After"] = "1"
+        return response, 503
 
     # 🔁 Import routes only after extensions are ready
     from app.routes import main, admin_bp
     app.register_blueprint(main, url_prefix='/api')
     app.register_blueprint(admin_bp)
 
+    background = background_workers_enabled(app)
+
+    # Parse uploaded resumes off the request path
+    if app.config.get("RESUME_PARSE_WORKERS", 0) > 0 and background:
+        from app import resume_parsing
+        resume_parsing.parse_pool = resume_parsing.ParseWorkerPool(
+            app, workers=app.config["RESUME_PARSE_WORKERS"]
+        ).start()
+
+    # Build logo / avatar thumbnails off the request path
+    if app.config.get("IMAGE_VARIANT_WORKERS", 0) > 0 and background:
+        from concurrent.futures import ThreadPoolExecutor
+        from app import images
+        images.variant_pool = ThreadPoolExecutor(
+            max_workers=app.config["IMAGE_VARIANT_WORKERS"], thread_name_prefix="image-variants"
+        )
+
+    # Push channel behind /api/notifications/stream
+    from app.pubsub import init_broker
+    init_broker(app, listen=background)
+
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Build the recommendation index now rather than inside the first request
+    if background:
+        from app.recommendations import job_index
+        job_index.warm(app)
+
+    # Expire past-deadline jobs in the background so listing GETs stay read-only
+    if app.config.get("JOB_EXPIRY_SCHEDULER") and background:
+        from app.expiry import start_expiry_scheduler
+        start_expiry_scheduler(app)
+
+    # Deliver queued emails (verification / reset codes) off the request path
+    if app.config.get("EMAIL_OUTBOX_WORKERS", 0) > 0 and background:
+        from app import email_outbox
+        email_outbox.outbox_pool = email_outbox.OutboxWorkerPool(
+            app,
+            workers=app.config["EMAIL_OUTBOX_WORKERS"],
+            poll_interval=app.config.get("EMAIL_OUTBOX_POLL_SECONDS", 5),
+        ).start()
+
+    # ETags, immutable caching for hashed paths, 304s, Range and optional X-Accel-Redirect (app/static_files.py)
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        return app.send_static_file(filename)
+        from app.static_files import send_upload
+        return send_upload(filename)
+
+    # Client build scanned once; restart after `npm run build` / `flask compress-spa`
+    from app.static_files import SpaAssets
+    client_build_dir = os.path.join(os.getcwd(), '..', 'client', 'dist')
+    spa_assets = SpaAssets.scan(client_build_dir)
 
     # SPA routing: Serve React app for all non-API routes
     @app.route('/', defaults={'path': ''})
@@ -62,14 +164,9 @@ def create_app():
         if path.startswith('api/') or path.startswith('uploads/'):
             return jsonify({"error": "Not found"}), 404
         
-        # Check if the requested file exists in the client build directory
-        client_build_dir = os.path.join(os.getcwd(), '..', 'client', 'dist')
-        if os.path.exists(client_build_dir):
-            # Check if it's a static file
-            if path and os.path.exists(os.path.join(client_build_dir, path)):
-                return send_from_directory(client_build_dir, path)
-            # For all other routes, serve index.html (SPA routing)
-            return send_from_directory(client_build_dir, 'index.html')
+        if spa_assets is not None:
+            # Static files from the build, index.html for everything else (SPA routing)
+            return spa_assets.send(path)
         else:
             # If build directory doesn't exist, return a helpful message for development
             return jsonify({"message": "JobHive Flask API is running! Access API routes at /api/... | For frontend, run the client development server."}), 200
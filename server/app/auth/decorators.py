@@ -1,16 +1,22 @@
 from functools import wraps
 from flask import request, jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
 from app.models import User
 
 def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
+        # Revocation is checked by verify_jwt_in_request (app/auth/tokens.py)
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        claims = get_jwt()
+        if "role" in claims:
+            role = claims["role"]
+        else:
+            # Token issued before role claims existed
+            user = User.query.get(get_jwt_identity())
+            role = user.role if user else None
 
-        if not user or user.role != "admin":
+        if role != "admin":
             return jsonify({"msg": "Admins only!"}), 403
 
         return fn(*args, **kwargs)
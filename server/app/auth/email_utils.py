@@ -1,8 +1,10 @@
 import smtplib
+import time
 from email.mime.text import MIMEText
 import os
 
-def send_verification_email(to_email, code):
+
+def verification_email(code):
     subject = "Verify your JobHive account"
     body = f"""Hi there,
 
@@ -11,33 +13,119 @@ Your verification code is: {code}
 Enter it in the app to complete your registration.
 
 – JobHive Team"""
+    return subject, body
+
+
+def reset_email(code):
+    subject = "Reset Your JobHive Password"
+    body = f"Your password reset code is: {code}\n\nIf you didn’t request this, just ignore this email."
+    return subject, body
+
+
+def queue_email(to_email, subject, body):
+    """
+    Add a message to the email outbox in the current transaction. It is sent
+    by the outbox workers (app/email_outbox.py) once the transaction commits.
+    """
+    from app import db
+    from app.models import EmailOutbox
+
+    message = EmailOutbox(to_email=to_email, subject=subject, body=body)
+    db.session.add(message)
+    return message
+
+
+def queue_verification_email(to_email, code):
+    return queue_email(to_email, *verification_email(code))
+
+
+def queue_reset_email(to_email, code):
+    return queue_email(to_email, *reset_email(code))
 
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = os.environ["EMAIL_FROM"]
-    msg["To"] = to_email
 
-    try:
-        with smtplib.SMTP(os.environ["EMAIL_HOST"], int(os.environ["EMAIL_PORT"])) as server:
+class SMTPConnection:
+    """
+    A reusable SMTP session. Connects (STARTTLS + login) on first use and
+    keeps the connection open across messages, reconnecting once if the
+    server dropped it in between.
+
+    Settings come from EMAIL_HOST, EMAIL_PORT, EMAIL_USER, EMAIL_PASS and
+    EMAIL_FROM; set EMAIL_USE_TLS=false for a plain local server such as aiosmtpd.
+    """
+
+    def __init__(self, host=None, port=None, user=None, password=None, use_tls=None, timeout=30, max_idle=60):
+        self.host = host or os.environ.get("EMAIL_HOST", "localhost")
+        self.port = int(port or os.environ.get("EMAIL_PORT", 587))
+        self.user = user if user is not None else os.environ.get("EMAIL_USER")
+        self.password = password if password is not None else os.environ.get("EMAIL_PASS")
+        if use_tls is None:
+            use_tls = os.environ.get("EMAIL_USE_TLS", "true").lower() == "true"
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.sender = os.environ.get("EMAIL_FROM")
+        self._server = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
             server.starttls()
-            server.login(os.environ["EMAIL_USER"], os.environ["EMAIL_PASS"])
-            server.send_message(msg)
-        print("✅ Email sent to", to_email)
-    except Exception as e:
-        print("❌ Failed to send email:", e)
+        if self.user:
+            server.login(self.user, self.password)
+        self._server = server
 
+    def _alive(self):
+        if self._server is None:
+            return False
+        # Servers drop idle sessions; probe before reusing one that sat around
+        if time.monotonic() - self._last_used < self.max_idle:
+            return True
+        try:
+            return self._server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
 
+    def send(self, to_email, subject, body):
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = self.sender
+        msg["To"] = to_email
 
-def send_reset_email(to_email, code):
-    subject = "Reset Your JobHive Password"
-    body = f"Your password reset code is: {code}\n\nIf you didn’t request this, just ignore this email."
+        if not self._alive():
+            self.close()
+            self._connect()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connect()
+            self._server.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
 
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = os.environ.get("EMAIL_FROM")
-    msg["To"] = to_email
+    def __enter__(self):
+        return self
 
-    with smtplib.SMTP(os.environ.get("EMAIL_HOST"), int(os.environ.get("EMAIL_PORT"))) as server:
-        server.starttls()
-        server.login(os.environ.get("EMAIL_USER"), os.environ.get("EMAIL_PASS"))
-        server.sendmail(msg["From"], [msg["To"]], msg.as_string())
+    def __exit__(self, *exc):
+        self.close()
+
+
+def send_verification_email(to_email, code):
+    """Send immediately, bypassing the outbox (used by scripts; requests queue instead)."""
+    with SMTPConnection() as connection:
+        connection.send(to_email, *verification_email(code))
+
+
+def send_reset_email(to_email, code):
+    with SMTPConnection() as connection:
+        connection.send(to_email, *reset_email(code))
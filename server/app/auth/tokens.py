@@ -0,0 +1,134 @@
+"""
+Access tokens carry the user's role, verification status and token
+version as claims, so authorization checks read the token instead of
+loading the user. Revocation works by bumping users.token_version: every
+authenticated request compares the token's version with the current one,
+served from a small per-process TTL cache. Other processes notice a bump
+within JWT_VERSION_CACHE_SECONDS.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from flask import current_app, request
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.base import NO_VALUE
+
+from app import db, jwt
+from app.models import User
+
+
+def issue_access_token(user):
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={
+            "role": user.role,
+            "is_verified": bool(user.is_verified),
+            "ver": user.token_version or 0,
+        },
+    )
+
+
+# Claim marking tokens that may only open the notification stream
+STREAM_SCOPE = "notifications_stream"
+STREAM_TOKEN_TTL = timedelta(minutes=2)
+
+
+def issue_stream_token(user):
+    """
+    Token for GET /notifications/stream?jwt=. It ends up in URLs (proxy
+    logs, history), so it expires quickly and no other endpoint accepts it.
+    It is only checked when the stream connects.
+    """
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={"scope": STREAM_SCOPE, "ver": user.token_version or 0},
+        expires_delta=STREAM_TOKEN_TTL,
+    )
+
+
+class TokenVersionCache:
+    """user id -> (token_version, expires at). None is cached too: a deleted user's tokens stay revoked."""
+
+    MAX_ENTRIES = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._invalidations = 0  # bumped by invalidate(); a read that raced one isn't cached
+
+    def get(self, user_id, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            invalidations = self._invalidations
+        if entry and entry[1] > now:
+            return entry[0]
+
+        version = db.session.query(User.token_version).filter(User.id == user_id).scalar()
+        with self._lock:
+            if invalidations == self._invalidations:
+                if len(self._entries) >= self.MAX_ENTRIES:
+                    self._entries.clear()
+                self._entries[user_id] = (version, now + ttl)
+        return version
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+
+version_cache = TokenVersionCache()
+
+
+def revoke_tokens(user):
+    """
+    Invalidate every token issued to `user` so far (password reset/change,
+    role change). The caller commits; this process's cached version is
+    dropped once it has, so a concurrent request can't re-cache the old one.
+    """
+    user.token_version = (user.token_version or 0) + 1
+    session = object_session(user) or db.session
+    session.info.setdefault("revoked_user_ids", set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_revoked_versions(session):
+    if session.in_nested_transaction():
+        return  # a savepoint released; wait for the real commit
+    for user_id in session.info.pop("revoked_user_ids", ()):
+        version_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_revoked_versions(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop("revoked_user_ids", None)
+
+
+@event.listens_for(User.role, "set", active_history=True)
+def _revoke_on_role_change(user, value, oldvalue, initiator):
+    # Tokens carry the role as a claim, so old ones must stop working when it changes
+    if oldvalue is not NO_VALUE and user.id is not None and value != oldvalue:
+        revoke_tokens(user)
+
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header, jwt_payload):
+    try:
+        user_id = int(jwt_payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    if jwt_payload.get("scope") == STREAM_SCOPE and request.endpoint != "main.stream_notifications":
+        return True
+    ttl = current_app.config.get("JWT_VERSION_CACHE_SECONDS", 30)
+    # Tokens issued before versioning have no "ver" and count as version 0
+    return version_cache.get(user_id, ttl) != jwt_payload.get("ver", 0)
@@ -0,0 +1,169 @@
+import click
+
+
+def register_commands(app):
+    """Attach the maintenance CLI commands (run with `flask <command>`)."""
+
+    @app.cli.command("expire-jobs")
+    def expire_jobs_command():
+        """Mark every job past its deadline as expired."""
+        from app.expiry import run_expiry_sweep
+
+        count = run_expiry_sweep(app)
+        if count is None:
+            click.echo("Another worker is already running the expiry sweep, skipped.")
+        else:
+            click.echo(f"Expired {count} job(s).")
+
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters_command():
+        """Rebuild the job and unread-notification counters from the source tables."""
+        from app.counters import reconcile_job_counters, reconcile_unread_notifications
+
+        drifted = reconcile_job_counters()
+        click.echo(f"Reconciled job counters ({drifted} job(s) had drifted).")
+        drifted = reconcile_unread_notifications()
+        click.echo(f"Reconciled unread notification counters ({drifted} user(s) had drifted).")
+
+    @app.cli.command("rebuild-search-index")
+    def rebuild_search_index_command():
+        """Rebuild the full-text job search index from scratch."""
+        from app.search import rebuild_search_index
+
+        count = rebuild_search_index()
+        click.echo(f"Indexed {count} job(s).")
+
+    @app.cli.command("backfill-skills")
+    def backfill_skills_command():
+        """Fill the normalized skills tables from Job.skills and JobSeeker.skills."""
+        from app.skills import backfill_skills
+
+        jobs, seekers = backfill_skills()
+        click.echo(f"Normalized skills for {jobs} job(s) and {seekers} job seeker(s).")
+
+    @app.cli.command("migrate-snapshots")
+    def migrate_snapshots_command():
+        """Move inline application resume snapshots into the deduplicated snapshot store."""
+        from app.snapshots import backfill_snapshots
+
+        migrated, distinct = backfill_snapshots()
+        click.echo(f"Migrated {migrated} application(s) onto {distinct} distinct snapshot(s).")
+
+    @app.cli.command("drain-outbox")
+    def drain_outbox_command():
+        """Send every queued email that is due now, over a single SMTP session."""
+        from app.email_outbox import drain_outbox
+
+        sent = drain_outbox()
+        click.echo(f"Sent {sent} queued email(s).")
+
+    @app.cli.command("send-digests")
+    @click.option("--queue-only", is_flag=True, help="Queue the digests in the outbox and let the workers send them.")
+    def send_digests_command(queue_only):
+        """Email employers their new applications and job seekers new jobs matching their skills."""
+        from app.digests import queue_digests, send_digests
+
+        if queue_only:
+            employers, seekers = queue_digests()
+            click.echo(f"Queued {employers} employer and {seekers} job seeker digest(s).")
+        else:
+            employers, seekers, sent = send_digests()
+            click.echo(f"Queued {employers} employer and {seekers} job seeker digest(s), sent {sent} email(s).")
+
+    @app.cli.command("compact-notifications")
+    def compact_notifications_command():
+        """Archive old read notifications and trim each user's feed to the configured cap."""
+        from app.notifications import compact_notifications
+
+        expired, trimmed = compact_notifications(
+            app.config["NOTIFICATION_RETENTION_DAYS"],
+            app.config["NOTIFICATION_MAX_PER_RECEIVER"],
+            archive=app.config["NOTIFICATION_ARCHIVE"],
+        )
+        action = "Archived" if app.config["NOTIFICATION_ARCHIVE"] else "Deleted"
+        click.echo(f"{action} {expired} old read notification(s) and {trimmed} over the per-user cap.")
+
+    @app.cli.command("parse-resumes")
+    def parse_resumes_command():
+        """Run every queued resume parse job in the foreground."""
+        from app.resume_parsing import process_parse_jobs
+
+        count = process_parse_jobs()
+        click.echo(f"Processed {count} resume parse job(s).")
+
+    @app.cli.command("parse-resume-dir")
+    @click.argument("directory", type=click.Path(exists=True, file_okay=False))
+    @click.option("--processes", type=int, default=None, help="Worker processes (default: CPU count).")
+    @click.option("--output", type=click.File("w"), default=None, help="Also write one JSON result per line here.")
+    def parse_resume_dir_command(directory, processes, output):
+        """Parse every PDF in DIRECTORY with the local parser and fill the resume result cache."""
+        import json
+        import os
+        from concurrent.futures import ProcessPoolExecutor
+        from sqlalchemy.exc import IntegrityError
+        from app import db
+        from app.models import ParsedResume
+        from app.resume_parsing import LocalParser, sha256_file, skill_vocabulary
+        from app.resume_text import parse_file
+
+        paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(".pdf")
+        )
+        vocabulary = skill_vocabulary()
+        cached = failed = 0
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(parse_file, path, vocabulary) for path in paths]
+            for path, future in zip(paths, futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    click.echo(f"❌ {path}: {e}", err=True)
+                    continue
+                if output:
+                    output.write(json.dumps({"file": path, **result}) + "\n")
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(ParsedResume(file_sha256=sha256_file(path), parser=LocalParser.name, result=result))
+                    cached += 1
+                except IntegrityError:
+                    pass  # already cached
+        db.session.commit()
+        click.echo(f"Parsed {len(paths) - failed} of {len(paths)} file(s), cached {cached} new result(s).")
+
+    @app.cli.command("gc-uploads")
+    def gc_uploads_command():
+        """Delete uploaded files no account references any more (after a grace period)."""
+        from app.storage import collect_garbage, clean_temp_files
+
+        deleted = collect_garbage()
+        temp = clean_temp_files()
+        click.echo(f"Deleted {deleted} unreferenced blob(s) and {temp} stale temp file(s).")
+
+    @app.cli.command("backfill-thumbnails")
+    @click.option("--force", is_flag=True, help="Rebuild thumbnails that already exist.")
+    def backfill_thumbnails_command(force):
+        """Build logo / banner / avatar thumbnails for existing uploads, migrating legacy files in uploads/."""
+        from app.images import backfill_variants
+
+        built, migrated, failed = backfill_variants(force=force)
+        click.echo(f"Built thumbnails for {built} image(s), migrated {migrated} legacy upload(s), {failed} failed.")
+
+    @app.cli.command("compress-spa")
+    @click.option("--dist", type=click.Path(exists=True, file_okay=False), default=None, help="Client build directory (default: ../client/dist).")
+    def compress_spa_command(dist):
+        """Write .gz / .br copies of the client build's text assets for serve_spa to hand out."""
+        import os
+        from app.static_files import precompress
+
+        dist = dist or os.path.join(os.getcwd(), "..", "client", "dist")
+        written = precompress(dist)
+        click.echo(f"Wrote {written} precompressed file(s). Restart the server to pick them up.")
+
+    @app.cli.command("prune-rate-limits")
+    def prune_rate_limits_command():
+        """Delete idle rate limit buckets (RATE_LIMIT_BACKEND = "database")."""
+        from app.rate_limit import prune_buckets
+
+        click.echo(f"Deleted {prune_buckets()} idle rate limit bucket(s).")
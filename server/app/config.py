@@ -10,6 +10,63 @@ class Config:
 
     SECRET_KEY = os.environ.get("SECRET_KEY", "fallback-secret")
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "fallback-jwt-key")
+    # Only the notification stream also reads ?jwt= (EventSource can't send headers), with a
+    # short-lived stream-only token; everything else takes the Authorization header
+    JWT_TOKEN_LOCATION = ["headers"]
+    # How long a process trusts its cached users.token_version (revocation delay across workers)
+    JWT_VERSION_CACHE_SECONDS = int(os.environ.get("JWT_VERSION_CACHE_SECONDS", 30))
+
+    # Password hashing (app/passwords.py). Give the method with its parameters, as stored in the hash;
+    # changing them rehashes each account at its next login.
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")  # or e.g. "pbkdf2:sha256:600000"
+    PASSWORD_SALT_LENGTH = int(os.environ.get("PASSWORD_SALT_LENGTH", 16))
+    PASSWORD_HASH_PROCESSES = int(os.environ.get("PASSWORD_HASH_PROCESSES", 2))  # per web worker; 0 = hash inline
+    PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", 16))  # waiting hashes before shedding with 503
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+    # Throttling of login and verification-code endpoints: "memory" (per process) or "database" (shared)
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+
+    # Start the background threads below (schedulers, workers, notification listener) in this process:
+    # "auto" = yes when serving (gunicorn, run.py, `flask run`) but not for other `flask <command>` runs
+    BACKGROUND_WORKERS = os.environ.get("BACKGROUND_WORKERS", "auto").lower()
+
+    # Background sweep that marks jobs past their deadline as expired
+    JOB_EXPIRY_SCHEDULER = os.environ.get("JOB_EXPIRY_SCHEDULER", "true").lower() == "true"
+    JOB_EXPIRY_INTERVAL_SECONDS = int(os.environ.get("JOB_EXPIRY_INTERVAL_SECONDS", 300))
+
+    # Threads delivering queued emails from the outbox (0 = run `flask drain-outbox` instead)
+    EMAIL_OUTBOX_WORKERS = int(os.environ.get("EMAIL_OUTBOX_WORKERS", 2))
+    EMAIL_OUTBOX_POLL_SECONDS = int(os.environ.get("EMAIL_OUTBOX_POLL_SECONDS", 5))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 6))
+
+    # Notification retention (`flask compact-notifications`)
+    NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", 90))  # read ones older than this go
+    NOTIFICATION_MAX_PER_RECEIVER = int(os.environ.get("NOTIFICATION_MAX_PER_RECEIVER", 500))
+    NOTIFICATION_ARCHIVE = os.environ.get("NOTIFICATION_ARCHIVE", "true").lower() == "true"  # false = delete outright
+
+    # Fan-out for /api/notifications/stream: "local" (single process) or "postgres" (LISTEN/NOTIFY across workers)
+    NOTIFICATION_BROKER = os.environ.get("NOTIFICATION_BROKER", "local")
+    NOTIFICATION_STREAM_KEEPALIVE_SECONDS = int(os.environ.get("NOTIFICATION_STREAM_KEEPALIVE_SECONDS", 15))
+
+    # Resume parsing runs in background threads: "affinda" (API), "local" (pypdf + heuristics,
+    # offline) or "stub" (tests / local dev)
+    RESUME_PARSER = os.environ.get("RESUME_PARSER", "affinda")
+    RESUME_PARSE_WORKERS = int(os.environ.get("RESUME_PARSE_WORKERS", 2))
+    RESUME_PARSE_PROCESSES = int(os.environ.get("RESUME_PARSE_PROCESSES", 0))  # local parser pool; 0 = CPU count
+
+    # Where uploads are stored (content-addressed, see app/storage.py): "local" or "s3"
+    UPLOAD_STORAGE = os.environ.get("UPLOAD_STORAGE", "local")
+    S3_BUCKET = os.environ.get("S3_BUCKET")
+    S3_PREFIX = os.environ.get("S3_PREFIX", "uploads")
+    S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")  # e.g. MinIO; unset for AWS
+    S3_PUBLIC_URL = os.environ.get("S3_PUBLIC_URL")
+    # Threads building logo / avatar thumbnails after upload (0 = run `flask backfill-thumbnails` instead)
+    IMAGE_VARIANT_WORKERS = int(os.environ.get("IMAGE_VARIANT_WORKERS", 2))
+    # Let the fronting proxy stream /uploads: "" (Python sends the bytes), "x-accel" (nginx) or "x-sendfile"
+    UPLOAD_SENDFILE = os.environ.get("UPLOAD_SENDFILE", "")
+    UPLOAD_ACCEL_PREFIX = os.environ.get("UPLOAD_ACCEL_PREFIX", "/protected-uploads/")  # nginx `internal` location aliased to uploads/
     
 # This will load your .env file and configure the database.
 
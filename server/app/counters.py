@@ -0,0 +1,108 @@
+from sqlalchemy import case, func, select
+from . import db
+
+
+def adjust_job_counter(job_id, field, delta):
+    """
+    Atomically add `delta` to a counter column on a job (UPDATE ... SET c = c + delta).
+    Call it before the commit that writes the matching Application/SavedJob row
+    so both land in the same transaction.
+    """
+    from .models import Job
+
+    column = getattr(Job, field)
+    Job.query.filter(Job.id == job_id).update(
+        # Leave updated_at alone: a counter bump isn't a content change
+        {column: column + delta, Job.updated_at: Job.updated_at},
+        synchronize_session=False,
+    )
+
+
+def release_seeker_activity(seeker_id):
+    """
+    Delete a job seeker's applications and saved jobs and decrement the
+    counters on every job they touched.
+    """
+    from .models import Job, Application, SavedJob
+
+    for model, field in ((Application, "applicant_count"), (SavedJob, "saved_count")):
+        owner_col = model.applicant_id if model is Application else model.seeker_id
+        per_job = (
+            db.session.query(model.job_id, func.count(model.id))
+            .filter(owner_col == seeker_id)
+            .group_by(model.job_id)
+            .all()
+        )
+        for job_id, n in per_job:
+            adjust_job_counter(job_id, field, -n)
+        model.query.filter(owner_col == seeker_id).delete(synchronize_session=False)
+
+
+def reconcile_job_counters():
+    """Rebuild applicant_count and saved_count from the applications and saved_jobs tables."""
+    from .models import Job, Application, SavedJob
+
+    applicants = (
+        select(func.count(Application.id))
+        .where(Application.job_id == Job.id)
+        .scalar_subquery()
+    )
+    saves = (
+        select(func.count(SavedJob.id))
+        .where(SavedJob.job_id == Job.id)
+        .scalar_subquery()
+    )
+    drifted = Job.query.filter(
+        (Job.applicant_count != applicants) | (Job.saved_count != saves)
+    ).count()
+
+    Job.query.update(
+        {Job.applicant_count: applicants, Job.saved_count: saves},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return drifted
+
+
+def adjust_unread_notifications(user_id, delta):
+    """Atomically add `delta` to a user's unread notification counter (floored at 0), in the caller's transaction."""
+    from .models import User
+
+    adjusted = User.unread_notifications + delta
+    User.query.filter(User.id == user_id).update(
+        # Never below zero, even if the counter was already behind the table
+        {User.unread_notifications: case((adjusted < 0, 0), else_=adjusted)},
+        synchronize_session=False,
+    )
+
+
+def reconcile_unread_notifications():
+    """Rebuild users.unread_notifications from the notifications table."""
+    from .models import User, Notification
+
+    unread = (
+        select(func.count(Notification.id))
+        .where(Notification.receiver_id == User.id, Notification.read == False)  # noqa: E712
+        .scalar_subquery()
+    )
+    drifted = User.query.filter(User.unread_notifications != unread).count()
+
+    User.query.update({User.unread_notifications: unread}, synchronize_session=False)
+    db.session.commit()
+    return drifted
+
+
+def backfill_counters(added_columns):
+    """
+    Rebuild the counters whose columns add_missing_columns just added. On an
+    upgraded database they start at the column default (0) while the source
+    rows already exist. Returns the names of the counters rebuilt.
+    """
+    rebuilt = []
+    if {"jobs.applicant_count", "jobs.saved_count"} & set(added_columns):
+        reconcile_job_counters()
+        rebuilt.append("jobs.applicant_count, jobs.saved_count")
+    if "users.unread_notifications" in added_columns:
+        reconcile_unread_notifications()
+        rebuilt.append("users.unread_notifications")
+    return rebuilt
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+from . import db
+
+
+EMPLOYER_DIGEST = "employer_applications"
+SEEKER_DIGEST = "seeker_jobs"
+
+# First run looks back this far instead of mailing the whole history
+FIRST_RUN_WINDOW = timedelta(days=1)
+MAX_JOBS_PER_SEEKER = 10
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _claim_window(kind, now):
+    """
+    Lock this digest's high-water mark row and return (since, run). The row
+    is advanced to `now` in the same transaction that queues the emails, so
+    a crashed run resends nothing and a concurrent run waits on the lock.
+    """
+    from .models import DigestRun
+
+    run = DigestRun.query.filter_by(kind=kind).with_for_update().first()
+    if run is None:
+        # Very first run: a concurrent one may insert the row too; the loser takes the winner's
+        try:
+            with db.session.begin_nested():
+                run = DigestRun(kind=kind, last_run_at=now - FIRST_RUN_WINDOW)
+                db.session.add(run)
+        except IntegrityError:
+            run = DigestRun.query.filter_by(kind=kind).with_for_update().one()
+    return run.last_run_at, run
+
+
+def employer_application_deltas(since, until):
+    """{employer_id: [(job_title, new application count), ...]} for applications received in the window."""
+    from .models import Job, Application
+
+    rows = db.session.execute(
+        select(Job.employer_id, Job.title, func.count(Application.id))
+        .join(Application, Application.job_id == Job.id)
+        .where(Application.applied_at > since, Application.applied_at <= until)
+        .group_by(Job.employer_id, Job.id, Job.title)
+        .order_by(Job.employer_id, func.count(Application.id).desc())
+    )
+    deltas = {}
+    for employer_id, title, count in rows:
+        deltas.setdefault(employer_id, []).append((title, count))
+    return deltas
+
+
+def seeker_job_matches(since, until, limit=MAX_JOBS_PER_SEEKER):
+    """
+    {seeker_id: [job_id, ...]} for active jobs posted in the window that
+    share at least one skill with the seeker, best overlap first. One join
+    over the normalized skill tables instead of a query per seeker.
+    """
+    from .models import Job, job_skills, seeker_skills
+
+    overlap = func.count(job_skills.c.skill_id)
+    rows = db.session.execute(
+        select(seeker_skills.c.seeker_id, Job.id)
+        .join(job_skills, job_skills.c.skill_id == seeker_skills.c.skill_id)
+        .join(Job, Job.id == job_skills.c.job_id)
+        .where(Job.created_at > since, Job.created_at <= until, Job.status == "active")
+        .group_by(seeker_skills.c.seeker_id, Job.id)
+        .order_by(seeker_skills.c.seeker_id, overlap.desc(), Job.created_at.desc())
+    )
+    matches = {}
+    for seeker_id, job_id in rows:
+        jobs = matches.setdefault(seeker_id, [])
+        if len(jobs) < limit:
+            jobs.append(job_id)
+    return matches
+
+
+def render_employer_digest(name, deltas):
+    total = sum(count for _, count in deltas)
+    subject = f"{total} new application{'s' if total != 1 else ''} on JobHive"
+    lines = [f"- {title}: {count} new" for title, count in deltas]
+    body = f"""Hi {name},
+
+Here's what came in since your last digest:
+
+{chr(10).join(lines)}
+
+Log in to review your applicants.
+
+– JobHive Team"""
+    return subject, body
+
+
+def render_seeker_digest(name, jobs):
+    subject = f"{len(jobs)} new job{'s' if len(jobs) != 1 else ''} matching your skills"
+    lines = [
+        f"- {job.title} at {job.employer.company_name if job.employer else 'N/A'} ({job.location})"
+        for job in jobs
+    ]
+    body = f"""Hi {name},
+
+New jobs that match your skills:
+
+{chr(10).join(lines)}
+
+Log in to apply.
+
+– JobHive Team"""
+    return subject, body
+
+
+def queue_digests(now=None):
+    """
+    Render every employer and job seeker digest for the window since the
+    last run and add them to the email outbox in one transaction.
+    Returns (employer digests, seeker digests) queued.
+    """
+    from app.auth.email_utils import queue_email
+    from .models import User, Job
+
+    now = now or _now()
+
+    since, employer_run = _claim_window(EMPLOYER_DIGEST, now)
+    employer_deltas = employer_application_deltas(since, now)
+
+    since, seeker_run = _claim_window(SEEKER_DIGEST, now)
+    seeker_matches = seeker_job_matches(since, now)
+
+    # Employers and seekers share the users.id primary key, so one lookup covers both
+    user_ids = set(employer_deltas) | set(seeker_matches)
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))} if user_ids else {}
+
+    job_ids = {job_id for ids in seeker_matches.values() for job_id in ids}
+    jobs = (
+        {j.id: j for j in Job.query.options(joinedload(Job.employer)).filter(Job.id.in_(job_ids))}
+        if job_ids else {}
+    )
+
+    employers = 0
+    for employer_id, deltas in employer_deltas.items():
+        user = users.get(employer_id)
+        if user:
+            queue_email(user.email, *render_employer_digest(user.name, deltas))
+            employers += 1
+
+    seekers = 0
+    for seeker_id, ids in seeker_matches.items():
+        user = users.get(seeker_id)
+        if user:
+            queue_email(user.email, *render_seeker_digest(user.name, [jobs[i] for i in ids]))
+            seekers += 1
+
+    employer_run.last_run_at = now
+    seeker_run.last_run_at = now
+    db.session.commit()
+    return employers, seekers
+
+
+def send_digests(connection=None):
+    """Queue this run's digests, then deliver the outbox over a single SMTP session."""
+    from .email_outbox import drain_outbox
+
+    employers, seekers = queue_digests()
+    sent = drain_outbox(connection)
+    return employers, seekers, sent
@@ -0,0 +1,165 @@
+import smtplib
+import threading
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from . import db
+
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30       # 30s, 1m, 2m, 4m, 8m ...
+BACKOFF_MAX_SECONDS = 3600
+STALE_CLAIM = timedelta(minutes=5)
+
+
+def _now():
+    # Stored datetimes are naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def claim_batch(limit=20):
+    """
+    Atomically claim up to `limit` due messages for this worker. Each row
+    is taken with a conditional UPDATE that only matches while it is still
+    due, so of two workers racing for a row exactly one sees rowcount 1.
+    That holds on SQLite too, where FOR UPDATE is ignored; on Postgres
+    SKIP LOCKED additionally lets workers pick disjoint candidates.
+    Claims abandoned by a crashed worker are picked up again after STALE_CLAIM.
+    """
+    from .models import EmailOutbox
+
+    now = _now()
+    due = or_(
+        and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+        and_(EmailOutbox.status == "sending", EmailOutbox.locked_at < now - STALE_CLAIM),
+    )
+    candidates = (
+        db.session.query(EmailOutbox.id)
+        .filter(due)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    claimed = []
+    for (message_id,) in candidates:
+        result = db.session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == message_id, due)
+            .values(status="sending", locked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            claimed.append(message_id)
+    db.session.commit()
+    if not claimed:
+        return []
+    return (
+        EmailOutbox.query
+        .filter(EmailOutbox.id.in_(claimed))
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .all()
+    )
+
+
+def _is_permanent(error):
+    """5xx replies (unknown mailbox, rejected sender) will fail the same way on every retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        # A 4xx per recipient (greylisting, mailbox full) is still worth retrying
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def deliver(messages, connection):
+    """Send claimed messages over one SMTP connection, recording success or scheduling a retry."""
+    max_attempts = current_app.config.get("EMAIL_OUTBOX_MAX_ATTEMPTS", MAX_ATTEMPTS)
+    sent = 0
+    for message in messages:
+        try:
+            connection.send(message.to_email, message.subject, message.body)
+        except Exception as e:
+            connection.close()
+            message.attempts += 1
+            message.last_error = str(e)[:2000]
+            message.locked_at = None
+            if message.attempts >= max_attempts or _is_permanent(e):
+                message.status = "failed"
+            else:
+                delay = min(BACKOFF_BASE_SECONDS * 2 ** (message.attempts - 1), BACKOFF_MAX_SECONDS)
+                message.status = "pending"
+                message.next_attempt_at = _now() + timedelta(seconds=delay)
+        else:
+            message.status = "sent"
+            message.sent_at = _now()
+            message.locked_at = None
+            sent += 1
+        db.session.commit()
+    return sent
+
+
+def drain_outbox(connection=None):
+    """Send everything that is due right now. Returns the number of messages sent."""
+    from app.auth.email_utils import SMTPConnection
+
+    connection = connection or SMTPConnection()
+    total = 0
+    with connection:
+        while True:
+            batch = claim_batch()
+            if not batch:
+                return total
+            total += deliver(batch, connection)
+
+
+class OutboxWorkerPool:
+    """
+    Background threads that drain the email outbox. Each thread keeps its
+    own persistent SMTP connection. Requests call notify() after committing
+    to wake a worker immediately; otherwise workers poll every `poll_interval`.
+    """
+
+    def __init__(self, app, workers=2, poll_interval=5):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._threads = []
+
+    def notify(self):
+        self._wakeup.set()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _run(self):
+        from app.auth.email_utils import SMTPConnection
+
+        connection = SMTPConnection()
+        while True:
+            try:
+                with self.app.app_context():
+                    batch = claim_batch()
+                    if batch:
+                        deliver(batch, connection)
+                        continue
+            except Exception as e:
+                self.app.logger.error(f"❌ Email outbox worker error: {e}")
+                connection.close()
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+
+# Set by create_app when workers are enabled
+outbox_pool = None
+
+
+def notify_outbox():
+    """Wake an outbox worker in this process, if any are running."""
+    if outbox_pool is not None:
+        outbox_pool.notify()
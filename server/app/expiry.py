@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from sqlalchemy import or_, text
+from . import db
+
+
+# Arbitrary but fixed key so every worker contends for the same advisory lock
+EXPIRY_LOCK_KEY = 724_311
+
+
+def expire_past_deadline_jobs(today=None):
+    """
+    Flip every job whose deadline has passed to 'expired' in one UPDATE.
+    Returns the number of rows changed.
+    """
+    from .models import Job
+
+    today = today or date.today()
+    count = (
+        Job.query
+        .filter(Job.deadline < today)
+        .filter(or_(Job.status.is_(None), Job.status != "expired"))
+        .update({Job.status: "expired"}, synchronize_session=False)
+    )
+    db.session.commit()
+    return count
+
+
+@contextmanager
+def _advisory_lock():
+    """Postgres session-level advisory lock; yields False if another worker holds it."""
+    conn = db.engine.connect()
+    try:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": EXPIRY_LOCK_KEY}).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": EXPIRY_LOCK_KEY})
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _file_lock(path):
+    """flock-based fallback for SQLite / single-host setups."""
+    import fcntl
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def sweeper_lock(app):
+    if db.engine.dialect.name == "postgresql":
+        return _advisory_lock()
+    return _file_lock(os.path.join(app.instance_path, "job-expiry.lock"))
+
+
+def run_expiry_sweep(app):
+    """Run one sweep if no other worker is already running it. Returns the count, or None if skipped."""
+    with app.app_context():
+        with sweeper_lock(app) as acquired:
+            if not acquired:
+                return None
+            return expire_past_deadline_jobs()
+
+
+def start_expiry_scheduler(app, interval=None):
+    """Start a daemon thread that sweeps expired jobs every `interval` seconds."""
+    interval = interval or app.config.get("JOB_EXPIRY_INTERVAL_SECONDS", 300)
+
+    def loop():
+        while True:
+            try:
+                count = run_expiry_sweep(app)
+                if count:
+                    app.logger.info(f"Expired {count} job(s) past their deadline")
+            except Exception as e:
+                app.logger.error(f"❌ Job expiry sweep failed: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="job-expiry-sweeper", daemon=True)
+    thread.start()
+    return thread
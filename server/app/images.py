@@ -0,0 +1,209 @@
+"""
+Thumbnails for uploaded logos, banners and profile pictures. Each image
+blob gets fixed-size WebP and JPEG variants stored next to it
+("ab/cd/<sha256>_128.webp"); their URLs are copied onto the employer /
+job seeker row so listings can serve a small image without a blob lookup.
+"""
+import os
+import tempfile
+
+from flask import current_app
+
+from . import db
+
+
+SIZES = (64, 128, 256)  # longest side in px; images are never upscaled
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+QUALITY = 82
+# Job cards draw the logo at 24-40 CSS px, so 64 covers 2x screens
+LISTING_SIZE = 64
+
+# (model, url column, variants column, blob_refs purpose) for every image an account shows
+IMAGE_COLUMNS = (
+    ("Employer", "logo_url", "logo_variants", "logo"),
+    ("Employer", "banner_url", "banner_variants", "banner"),
+    ("JobSeeker", "profile_picture", "profile_picture_variants", "profile_picture"),
+)
+
+
+def pick_variant(variants, fallback, size=LISTING_SIZE, fmt="webp"):
+    """One thumbnail URL from a *_variants map, or `fallback` (the original) until they're built."""
+    try:
+        return variants[str(size)][fmt]
+    except (KeyError, TypeError):
+        return fallback
+
+
+def variant_key(key, size, fmt):
+    return f"{os.path.splitext(key)[0]}_{size}.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def render_variants(path, out_dir, sizes=SIZES):
+    """
+    Write every size/format of the image at `path` to temp files in
+    `out_dir`. Returns [(size, fmt, temp path), ...]. Raises OSError
+    (PIL.UnidentifiedImageError) for files Pillow can't read.
+    """
+    from PIL import Image, ImageOps
+
+    rendered = []
+    try:
+        with Image.open(path) as original:
+            image = ImageOps.exif_transpose(original)  # phone photos are often stored sideways
+            has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+            # Largest first, each size shrunk from the previous one rather than the full original
+            for size in sorted(sizes, reverse=True):
+                image.thumbnail((size, size), Image.Resampling.LANCZOS)
+                for fmt, (pil_format, _) in FORMATS.items():
+                    out = image
+                    if pil_format == "JPEG" and image.mode == "RGBA":
+                        out = Image.new("RGB", image.size, "white")
+                        out.paste(image, mask=image.getchannel("A"))
+                    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=f".{fmt}")
+                    os.close(fd)
+                    rendered.append((size, fmt, tmp_path))
+                    out.save(tmp_path, pil_format, quality=QUALITY)
+    except BaseException:
+        for _, _, tmp_path in rendered:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    return rendered
+
+
+def variant_urls(blob):
+    from .storage import get_storage
+
+    storage = get_storage()
+    return {
+        size: {fmt: storage.url(key) for fmt, key in formats.items()}
+        for size, formats in (blob.variants or {}).items()
+    }
+
+
+def variants_for_url(url):
+    """Thumbnail URLs for an upload URL whose variants already exist (e.g. a re-uploaded image), else None."""
+    from .models import StoredBlob
+    from .storage import key_from_url
+
+    key = key_from_url(url)
+    blob = db.session.get(StoredBlob, key) if key else None
+    return variant_urls(blob) if blob is not None and blob.variants else None
+
+
+def apply_variants(blob):
+    """Point every logo, banner and profile picture showing this blob at its thumbnails. The caller commits."""
+    from . import models
+
+    urls = variant_urls(blob)
+    for model_name, url_column, variants_column, _ in IMAGE_COLUMNS:
+        model = getattr(models, model_name)
+        # Match on the key: the client stores some URLs absolute ("http://host/uploads/ab/cd/...")
+        model.query.filter(getattr(model, url_column).endswith(f"/{blob.key}")).update(
+            {getattr(model, variants_column): urls}, synchronize_session=False
+        )
+
+
+def generate_variants(key, force=False):
+    """
+    Build and store the thumbnails of blob `key` (skipped if they exist,
+    unless `force`), then copy their URLs onto its owners and commit.
+    Returns the variant map, or None if the blob is gone.
+    """
+    from .models import StoredBlob
+    from .storage import get_storage
+
+    blob = db.session.get(StoredBlob, key)
+    if blob is None:
+        return None
+
+    if force or not blob.variants:
+        storage = get_storage()
+        variants = {}
+        for size, fmt, tmp_path in render_variants(storage.local_path(key), storage.temp_dir()):
+            vkey = variant_key(key, size, fmt)
+            storage.put(vkey, tmp_path, FORMATS[fmt][1])
+            variants.setdefault(str(size), {})[fmt] = vkey
+        blob.variants = variants
+
+    apply_variants(blob)
+    db.session.commit()
+    return blob.variants
+
+
+# Thread pool set by create_app when IMAGE_VARIANT_WORKERS > 0. Pillow releases
+# the GIL while resizing and encoding, so threads are enough here.
+variant_pool = None
+
+
+def _run(app, key):
+    with app.app_context():
+        try:
+            generate_variants(key)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"❌ Thumbnail generation failed for {key}: {e}")
+
+
+def queue_variants(key):
+    """
+    Build thumbnails for blob `key` in the background. Call after the
+    upload has committed. Without a pool (workers disabled, tests) this is
+    a no-op and `flask backfill-thumbnails` catches up.
+    """
+    if variant_pool is not None:
+        variant_pool.submit(_run, current_app._get_current_object(), key)
+
+
+def _legacy_path(url):
+    """Local file behind a pre-blob upload URL ("/uploads/logo.png" or an absolute .../uploads/ link)."""
+    if not url or "/uploads/" not in url:
+        return None
+    filename = url.rsplit("/uploads/", 1)[1]
+    path = os.path.join(current_app.config["UPLOAD_FOLDER"], *filename.split("/"))
+    return path if os.path.isfile(path) else None
+
+
+def backfill_variants(force=False):
+    """
+    Thumbnails for every image an account currently shows. Legacy flat
+    uploads from before content-addressed storage are first copied into
+    blob storage and the owner's URL rewritten to the blob.
+    Returns (images built, legacy files migrated, failures).
+    """
+    from . import models
+    from .storage import get_storage, key_from_url, save_file, add_ref
+
+    storage = get_storage()
+    keys = set()
+    migrated = 0
+    for model_name, url_column, _, purpose in IMAGE_COLUMNS:
+        model = getattr(models, model_name)
+        column = getattr(model, url_column)
+        for owner in model.query.filter(column.isnot(None), column != "").all():
+            url = getattr(owner, url_column)
+            key = key_from_url(url)
+            if key is None:
+                path = _legacy_path(url)
+                if path is None:
+                    continue  # external link or a file that's gone
+                blob = save_file(path)
+                add_ref(blob.key, owner.id, purpose, replace=True)
+                setattr(owner, url_column, storage.url(blob.key))
+                db.session.commit()
+                key = blob.key
+                migrated += 1
+            keys.add(key)
+
+    built = failed = 0
+    for key in sorted(keys):
+        try:
+            if generate_variants(key, force=force) is not None:
+                built += 1
+        except OSError as e:
+            db.session.rollback()
+            current_app.logger.error(f"❌ Could not build thumbnails for {key}: {e}")
+            failed += 1
+    return built, migrated, failed
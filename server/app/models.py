@@ -1,9 +1,11 @@
 from . import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from .passwords import hash_password, verify_password, needs_rehash
 from datetime import datetime, timezone
 from sqlalchemy.dialects.postgresql import JSONB
 import json
 
+from .images import pick_variant
+
 
 # ============================
 # 🧍 Base User Model
@@ -23,11 +25,22 @@ class User(db.Model):
     reset_code = db.Column(db.String(6), nullable=True)
     reset_code_sent_at = db.Column(db.DateTime, nullable=True)
 
+    # Maintained alongside notifications.read (app/notifications.py) so the badge poll is a PK lookup
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Copied into each access token ("ver" claim); bumping it revokes every token issued so far
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Hashing runs in app/passwords.py's process pool and may raise PasswordHashingBusy (503)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify, upgrading the stored hash if the configured parameters changed (the caller commits)."""
+        if not verify_password(self.password_hash, password):
+            return False
+        if needs_rehash(self.password_hash):
+            self.password_hash = hash_password(password)
+        return True
 
 
 # ============================
@@ -131,17 +144,21 @@ class JobSeeker(db.Model):
     country_code = db.Column(db.String(10))
     address = db.Column(db.String(255))
     profile_picture = db.Column(db.String(500))  # Store filename or URL
+    # {"64": {"webp": url, "jpeg": url}, ...} once app/images.py has built the thumbnails
+    profile_picture_variants = db.Column(db.JSON)
 
     # Store education as a list of entries
     education = db.Column(db.JSON)  # List of dicts: [{degree, institution, yearStart, yearEnd, description}]
     
-    # Skills as an array of strings
-    skills = db.Column(db.ARRAY(db.String))  # Or db.JSON if using SQLite
+    # Skills as an array of strings (JSON on SQLite, which has no ARRAY type).
+    # The normalized copy used for lookups lives in seeker_skills.
+    skills = db.Column(db.ARRAY(db.String).with_variant(db.JSON, "sqlite"))
     cv_url = db.Column(db.String(1000))
     bio = db.Column(db.Text)
 
     # Relationship to user
-    user = db.relationship("User", backref=db.backref("job_seeker", uselist=False))
+    user = db.relationship("User", backref=db.backref("job_seeker", uselist=False, cascade="all, delete-orphan"))
+    skill_set = db.relationship("Skill", secondary="seeker_skills")
 
 
 
@@ -159,6 +176,9 @@ class Employer(db.Model):
     company_desc = db.Column(db.Text)
     logo_url = db.Column(db.String(255))
     banner_url = db.Column(db.String(255))
+    # Thumbnail URLs by size and format, filled in by app/images.py
+    logo_variants = db.Column(db.JSON)
+    banner_variants = db.Column(db.JSON)
 
     # Founding Info
     founded_year = db.Column(db.Integer)
@@ -176,10 +196,40 @@ class Employer(db.Model):
     email = db.Column(db.String(255))
 
     # Relationship to User
-    user = db.relationship("User", backref=db.backref("employer", uselist=False))
+    user = db.relationship("User", backref=db.backref("employer", uselist=False, cascade="all, delete-orphan"))
 
 
 
+# ============================
+# 🧩 Skill Model (normalized skills)
+# ============================
+class Skill(db.Model):
+    __tablename__ = "skills"
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False, index=True)  # case-folded, canonical
+    display_name = db.Column(db.String(100), nullable=False)  # as first entered, e.g. "PostgreSQL"
+
+    def __repr__(self):
+        return f"<Skill {self.name}>"
+
+
+job_skills = db.Table(
+    "job_skills",
+    db.Column("job_id", db.Integer, db.ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("skill_id", db.Integer, db.ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+    # PK covers job -> skills; this covers skill -> jobs lookups
+    db.Index("ix_job_skills_skill_id_job_id", "skill_id", "job_id"),
+)
+
+seeker_skills = db.Table(
+    "seeker_skills",
+    db.Column("seeker_id", db.Integer, db.ForeignKey("job_seekers.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("skill_id", db.Integer, db.ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+    db.Index("ix_seeker_skills_skill_id_seeker_id", "skill_id", "seeker_id"),
+)
+
+
 # ============================
 # 🛡️ Admin Model
 # ============================
@@ -197,6 +247,12 @@ class Admin(db.Model):
 
 class Job(db.Model):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Backs the keyset pagination on GET /api/jobs
+        db.Index("ix_jobs_created_at_id", "created_at", "id"),
+        db.Index("ix_jobs_employer_id", "employer_id"),
+        db.Index("ix_jobs_employer_applicant_count", "employer_id", "applicant_count"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     employer_id = db.Column(db.Integer, db.ForeignKey("employers.id"), nullable=False)  # ✅ This line
@@ -209,9 +265,14 @@ class Job(db.Model):
     salary = db.Column(db.String(100))
     deadline = db.Column(db.Date)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc)) 
-    skills = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), index=True)
+    skills = db.Column(db.Text)  # comma-joined display copy; job_skills is the indexed source
     status = db.Column(db.String(20), default="active")  # values: active, expired, closed
 
+    # Denormalized counters, kept in step by app/counters.py (`flask reconcile-counters` rebuilds them)
+    applicant_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    saved_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     saved_jobs = db.relationship(
     "SavedJob",
     back_populates="job",
@@ -221,6 +282,7 @@ class Job(db.Model):
 
 
     employer = db.relationship("Employer", backref="jobs")
+    skill_set = db.relationship("Skill", secondary="job_skills")
     applications = db.relationship(
     "Application",
     back_populates="job",
@@ -243,9 +305,11 @@ class Job(db.Model):
         "deadline": str(self.deadline) if self.deadline else None,
         "posted_by": self.employer_id,
         "company_name": self.employer.company_name if self.employer and self.employer.company_name else "N/A",
-        "company_logo": self.employer.logo_url if self.employer and self.employer.logo_url else "",
+        "company_logo": pick_variant(self.employer.logo_variants, self.employer.logo_url or "") if self.employer else "",
+        "company_logo_variants": self.employer.logo_variants if self.employer else None,
         "skills": self.skills.split(",") if self.skills else [],
-        "applicant_count": self.applications.count(),
+        "applicant_count": self.applicant_count or 0,
+        "saved_count": self.saved_count or 0,
         "status": self.status,
         "postedDate": self.created_at.strftime('%Y-%m-%d') if self.created_at else None,
 
@@ -263,16 +327,34 @@ class Job(db.Model):
 # ============================
 class Application(db.Model):
     __tablename__ = "applications"
+    __table_args__ = (
+        # Serves ?sort=match on the applicant list
+        db.Index("ix_applications_job_id_match_score", "job_id", "match_score"),
+        # Digest job pulls applications received since its last run
+        db.Index("ix_applications_applied_at", "applied_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     applicant_id = db.Column(db.Integer, db.ForeignKey("job_seekers.id"), nullable=False)
     job_id = db.Column(db.Integer, db.ForeignKey("jobs.id"), nullable=False)
-    resume_snapshot = db.Column(JSONB, nullable=False)  # Storing resume as JSON
+    # Legacy inline copy; new rows reference the deduplicated store via snapshot_digest
+    # none_as_null: clearing it must store SQL NULL, not the JSON literal 'null'
+    resume_snapshot = db.Column(db.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"), nullable=True)
+    snapshot_digest = db.Column(db.String(64), db.ForeignKey("resume_snapshots.digest"), nullable=True, index=True)
     applied_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     cv_url = db.Column(db.String(1000))
+    match_score = db.Column(db.Float, nullable=True)  # resume vs job similarity; NULL = not scored yet
 
     job = db.relationship("Job", back_populates="applications")
     job_seeker = db.relationship("JobSeeker", backref="applications")
+    snapshot = db.relationship("ResumeSnapshot")
+
+    @property
+    def snapshot_data(self):
+        """The resume as submitted, from the snapshot store or the legacy inline column."""
+        if self.snapshot_digest and self.snapshot is not None:
+            return self.snapshot.data
+        return self.resume_snapshot or {}
 
     def to_dict(self):
         return {
@@ -283,12 +365,49 @@ class Application(db.Model):
         "name": self.job_seeker.full_name if self.job_seeker else "Unknown",
         "email": self.job_seeker.user.email if self.job_seeker and self.job_seeker.user else "N/A",
         "resume_snapshot": {
-            **self.resume_snapshot,  # Include all the current fields in resume_snapshot
+            **self.snapshot_data,  # Include all the current fields in resume_snapshot
             "cv_url": self.job_seeker.cv_url if self.job_seeker else None,  # Keep cv_url as it is, no need to prepend base URL
         },
     }
 
+    def to_summary_dict(self):
+        """
+        Lightweight row for applicant lists: no resume body, just a digest of it.
+        Load with joinedload(Application.job_seeker).joinedload(JobSeeker.user)
+        to keep the list at one query. The full snapshot is served by
+        GET /api/applications/<id>.
+        """
+        from app.snapshots import snapshot_digest
 
+        job_seeker = self.job_seeker
+        return {
+        "id": self.id,
+        "job_id": self.job_id,
+        "applicant_id": self.applicant_id,
+        "applied_at": self.applied_at.isoformat(),
+        "name": job_seeker.full_name if job_seeker else "Unknown",
+        "email": job_seeker.user.email if job_seeker and job_seeker.user else "N/A",
+        "cv_url": (job_seeker.cv_url if job_seeker else None) or self.cv_url,
+        "snapshot_digest": self.snapshot_digest or snapshot_digest(self.resume_snapshot or {}),
+        "match_score": self.match_score,
+    }
+
+
+
+
+# ============================
+# 🗂️ ResumeSnapshot Model (content-addressed)
+# ============================
+class ResumeSnapshot(db.Model):
+    __tablename__ = "resume_snapshots"
+
+    # SHA-256 of the canonical (sorted-key) JSON, see app/snapshots.py
+    digest = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<ResumeSnapshot {self.digest[:12]}>"
 
 
 # ============================
@@ -298,6 +417,12 @@ class Application(db.Model):
 
 class Notification(db.Model):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Unread filter for mark-all-read and the retention sweep
+        db.Index("ix_notifications_receiver_read_created_at", "receiver_id", "read", "created_at"),
+        # A user's feed, newest first, paged on (created_at, id)
+        db.Index("ix_notifications_receiver_created_at_id", "receiver_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     receiver_id = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -309,7 +434,19 @@ class Notification(db.Model):
     receiver = db.relationship("User", backref="notifications")
     admin = db.relationship("Admin", backref="sent_notifications")
 
-    
+
+class NotificationArchive(db.Model):
+    """Notifications moved out of the hot table by the retention job (app/notifications.py)."""
+    __tablename__ = "notifications_archive"
+
+    id = db.Column(db.Integer, primary_key=True)  # same id as the original notification
+    receiver_id = db.Column(db.Integer, index=True)
+    body = db.Column(db.String(2000), nullable=False)
+    created_at = db.Column(db.DateTime)
+    admin_id = db.Column(db.Integer, nullable=True)
+    read = db.Column(db.Boolean)
+    archived_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
 
 # ============================
 # 💾 SavedJob Model
@@ -368,12 +505,10 @@ class PendingUser(db.Model):
     expires_at = db.Column(db.DateTime, nullable=False)  # Auto-cleanup expired entries
 
     def set_password(self, password):
-        from werkzeug.security import generate_password_hash
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        from werkzeug.security import check_password_hash
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
     @classmethod
     def cleanup_expired(cls):
@@ -402,4 +537,125 @@ class PendingUser(db.Model):
         return f'<PendingUser {self.email}>'
 
 
+# ============================
+# 📮 EmailOutbox Model (transactional outbox)
+# ============================
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Workers poll for due messages: WHERE status = 'pending' AND next_attempt_at <= now
+        db.Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    locked_at = db.Column(db.DateTime, nullable=True)  # when a worker claimed it; stale claims are retried
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} to {self.to_email} ({self.status})>"
+
+
+# ============================
+# 📰 DigestRun Model (digest email high-water marks)
+# ============================
+class DigestRun(db.Model):
+    __tablename__ = "digest_runs"
+
+    kind = db.Column(db.String(50), primary_key=True)  # "employer_applications", "seeker_jobs"
+    last_run_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<DigestRun {self.kind} @ {self.last_run_at}>"
+
+
+# ============================
+# 📑 Resume parsing (background jobs + result cache)
+# ============================
+class ResumeParseJob(db.Model):
+    __tablename__ = "resume_parse_jobs"
+    __table_args__ = (
+        db.Index("ix_resume_parse_jobs_status_created_at", "status", "created_at"),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, handed to the client to poll
+    owner_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_sha256 = db.Column(db.String(64), nullable=False)
+    file_path = db.Column(db.String(1000), nullable=False)
+    content_type = db.Column(db.String(255))
+    cv_url = db.Column(db.String(1000))
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done, failed
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "cv_url": self.cv_url,
+            "error": self.error,
+        }
+        if self.result:
+            data.update(self.result)
+        return data
+
+
+class ParsedResume(db.Model):
+    __tablename__ = "parsed_resumes"
+
+    # Same file bytes + same parser = same answer, so results are reused across uploads
+    file_sha256 = db.Column(db.String(64), primary_key=True)
+    parser = db.Column(db.String(50), primary_key=True)
+    result = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+# ============================
+# 🗄️ Upload storage (content-addressed blobs + references)
+# ============================
+class StoredBlob(db.Model):
+    __tablename__ = "stored_blobs"
+
+    key = db.Column(db.String(200), primary_key=True)  # "ab/cd/<sha256>.<ext>", see app/storage.py
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(255))
+    # Number of blob_refs rows; blobs at 0 are deleted by the garbage collector after a grace period
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Image blobs only: {"64": {"webp": key, "jpeg": key}, ...}; NULL until the thumbnails exist
+    variants = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class BlobRef(db.Model):
+    __tablename__ = "blob_refs"
+    __table_args__ = (
+        db.UniqueConstraint("blob_key", "owner_id", "purpose", name="uq_blob_refs_blob_owner_purpose"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    blob_key = db.Column(db.String(200), db.ForeignKey("stored_blobs.key"), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    purpose = db.Column(db.String(30), nullable=False)  # cv, profile_picture, logo, banner
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+# ============================
+# 🚦 Rate limit buckets (RATE_LIMIT_BACKEND = "database")
+# ============================
+class RateLimitBucket(db.Model):
+    __tablename__ = "rate_limit_buckets"
 
+    key = db.Column(db.String(320), primary_key=True)  # "<rule>:<ip|email>:<value>", see app/rate_limit.py
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False, index=True)  # unix time, comparable across hosts
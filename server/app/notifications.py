@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+from . import db
+from .counters import adjust_unread_notifications
+
+
+COMPACTION_BATCH_SIZE = 1000
+
+
+def create_notification(receiver_id, body, admin_id=None):
+    """
+    Add a notification and bump the receiver's unread counter in the
+    current transaction. The caller commits.
+    """
+    from .models import Notification
+
+    notification = Notification(receiver_id=receiver_id, body=body, admin_id=admin_id)
+    db.session.add(notification)
+    adjust_unread_notifications(receiver_id, 1)
+    return notification
+
+
+def mark_all_read(user_id):
+    """
+    Flip every unread notification for a user in one UPDATE and take exactly
+    that many off the counter, so a notification created concurrently stays
+    counted. Returns the number of notifications marked.
+    """
+    from .models import Notification
+
+    marked = Notification.query.filter_by(receiver_id=user_id, read=False).update(
+        {Notification.read: True}, synchronize_session=False
+    )
+    if marked:
+        adjust_unread_notifications(user_id, -marked)
+    db.session.commit()
+    return marked
+
+
+def unread_count(user_id):
+    """The maintained unread counter for a user, or None if the user doesn't exist."""
+    from .models import User
+
+    return db.session.query(User.unread_notifications).filter(User.id == user_id).scalar()
+
+
+def _remove_batch(ids, archive):
+    """Move (or just delete) one batch of notifications and fix up unread counters for any unread ones."""
+    from .models import Notification, NotificationArchive
+
+    columns = ["id", "receiver_id", "body", "created_at", "admin_id", "read"]
+    unread = db.session.execute(
+        select(Notification.receiver_id, func.count(Notification.id))
+        .where(Notification.id.in_(ids), Notification.read == False)  # noqa: E712
+        .group_by(Notification.receiver_id)
+    ).all()
+
+    if archive:
+        db.session.execute(
+            insert(NotificationArchive).from_select(
+                columns,
+                select(*(getattr(Notification, c) for c in columns)).where(Notification.id.in_(ids)),
+            )
+        )
+    Notification.query.filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+    for receiver_id, n in unread:
+        adjust_unread_notifications(receiver_id, -n)
+    db.session.commit()
+
+
+def expire_read_notifications(max_age_days, archive=True, batch_size=COMPACTION_BATCH_SIZE):
+    """Remove read notifications older than `max_age_days`, one batch per transaction. Returns the count."""
+    from .models import Notification
+
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=max_age_days)
+    removed = 0
+    while True:
+        ids = [
+            row_id for (row_id,) in
+            db.session.query(Notification.id)
+            .filter(Notification.read == True, Notification.created_at < cutoff)  # noqa: E712
+            .order_by(Notification.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            return removed
+        _remove_batch(ids, archive)
+        removed += len(ids)
+
+
+def cap_notifications_per_receiver(cap, archive=True, batch_size=COMPACTION_BATCH_SIZE):
+    """
+    Keep only the newest `cap` notifications per receiver. Only receivers
+    over the cap are visited, found with one GROUP BY ... HAVING.
+    Returns the number removed.
+    """
+    from .models import Notification
+
+    over_cap = db.session.execute(
+        select(Notification.receiver_id)
+        .group_by(Notification.receiver_id)
+        .having(func.count(Notification.id) > cap)
+    ).scalars().all()
+
+    removed = 0
+    for receiver_id in over_cap:
+        while True:
+            ids = [
+                row_id for (row_id,) in
+                db.session.query(Notification.id)
+                .filter(Notification.receiver_id == receiver_id)
+                .order_by(Notification.created_at.desc(), Notification.id.desc())
+                .offset(cap)
+                .limit(batch_size)
+            ]
+            if not ids:
+                break
+            _remove_batch(ids, archive)
+            removed += len(ids)
+    return removed
+
+
+def compact_notifications(max_age_days, cap, archive=True):
+    """Retention pass: age out old read notifications, then trim receivers over the cap."""
+    expired = expire_read_notifications(max_age_days, archive=archive)
+    trimmed = cap_notifications_per_receiver(cap, archive=archive)
+    return expired, trimmed
@@ -0,0 +1,73 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    """Turn the (created_at, id) of the last row on a page into an opaque token."""
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Reverse of encode_cursor. Raises InvalidCursor on anything malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(created_at) if created_at else None
+        return created_at, int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Read a ?limit= value, falling back to the default and clamping to [1, maximum]."""
+    try:
+        size = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def keyset_paginate(query, created_col, id_col, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Newest-first keyset pagination over (created_at, id).
+
+    Returns (rows, next_cursor). next_cursor is None on the last page.
+    Rows with the same created_at are split by id, so the order is stable
+    even when several rows are inserted in the same instant.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.filter(created_col.is_(None), id_col < row_id)
+        else:
+            query = query.filter(or_(
+                created_col < created_at,
+                and_(created_col == created_at, id_col < row_id),
+                created_col.is_(None),
+            ))
+
+    # NULL created_at (legacy rows) sorts last on both Postgres and SQLite
+    rows = (
+        query.order_by(created_col.is_(None), created_col.desc(), id_col.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+    return rows, next_cursor
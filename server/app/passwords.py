@@ -0,0 +1,76 @@
+"""
+Password hashing off the request thread. scrypt/PBKDF2 are deliberately
+CPU-heavy, so a burst of logins or sign-ups would otherwise pin every web
+worker. Hashes are computed in a small process pool; at most
+PASSWORD_HASH_PROCESSES + PASSWORD_HASH_QUEUE hashes are in flight per web
+worker and anything beyond that fails fast with PasswordHashingBusy, which
+create_app turns into a 503 with Retry-After.
+"""
+import threading
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing pool is saturated (or too slow); the client should retry shortly."""
+
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """(executor, in-flight semaphore), created on first use; (None, None) when hashing runs inline."""
+    global _pool, _slots
+    processes = current_app.config.get("PASSWORD_HASH_PROCESSES", 0)
+    if processes <= 0:
+        return None, None
+    with _pool_lock:
+        if _pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            _pool = ProcessPoolExecutor(max_workers=processes)
+            _slots = threading.BoundedSemaphore(processes + current_app.config.get("PASSWORD_HASH_QUEUE", 0))
+        return _pool, _slots
+
+
+def _run(fn, *args):
+    pool, slots = _get_pool()
+    if pool is None:
+        return fn(*args)
+
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        future = pool.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+
+    from concurrent.futures import TimeoutError
+
+    try:
+        return future.result(timeout=current_app.config.get("PASSWORD_HASH_TIMEOUT", 10))
+    except TimeoutError:
+        raise PasswordHashingBusy()
+
+
+def hash_password(password):
+    config = current_app.config
+    return _run(generate_password_hash, password, config["PASSWORD_HASH_METHOD"], config["PASSWORD_SALT_LENGTH"])
+
+
+def verify_password(password_hash, password):
+    if not password_hash or password is None:
+        return False
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """True if the hash was made with a different method, cost or salt length than configured now."""
+    method, _, rest = (password_hash or "").partition("$")
+    salt = rest.partition("$")[0]
+    return method != current_app.config["PASSWORD_HASH_METHOD"] or len(salt) != current_app.config["PASSWORD_SALT_LENGTH"]
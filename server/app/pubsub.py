@@ -0,0 +1,165 @@
+import json
+import queue
+import select
+import threading
+from datetime import timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import db
+
+
+class LocalBroker:
+    """
+    In-process fan-out. Every open stream subscribes a queue under its
+    user id; publish() drops the event into each of that user's queues.
+    Only reaches streams served by this process, which is enough for a
+    single worker (or the Flask dev server).
+    """
+
+    # Slow consumers get events dropped rather than growing memory without bound
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> set of queues
+
+    def subscribe(self, user_id):
+        q = queue.Queue(maxsize=self.QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(q)
+        return q
+
+    def unsubscribe(self, user_id, q):
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues:
+                queues.discard(q)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def deliver(self, user_id, payload):
+        with self._lock:
+            queues = list(self._subscribers.get(user_id, ()))
+        for q in queues:
+            try:
+                q.put_nowait(payload)
+            except queue.Full:
+                pass
+
+    def publish(self, user_id, payload):
+        self.deliver(user_id, payload)
+
+    def start(self, app, listen=True):
+        return self
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Shares events between gunicorn workers (and hosts) through Postgres
+    LISTEN/NOTIFY. publish() issues pg_notify; one listener thread per
+    process receives every event and hands it to the local fan-out.
+    """
+
+    CHANNEL = "jobhive_notifications"
+
+    def start(self, app, listen=True):
+        self._engine = db.engine
+        if listen:
+            thread = threading.Thread(target=self._listen, name="notification-listener", daemon=True)
+            thread.start()
+        return self
+
+    def publish(self, user_id, payload):
+        message = json.dumps({"user_id": user_id, "payload": payload})
+        with self._engine.begin() as conn:
+            conn.exec_driver_sql("SELECT pg_notify(%s, %s)", (self.CHANNEL, message))
+
+    def _listen(self):
+        while True:
+            try:
+                conn = self._engine.raw_connection()
+                try:
+                    dbapi_conn = conn.driver_connection
+                    dbapi_conn.autocommit = True
+                    dbapi_conn.cursor().execute(f"LISTEN {self.CHANNEL}")
+                    while True:
+                        if select.select([dbapi_conn], [], [], 30) == ([], [], []):
+                            continue
+                        dbapi_conn.poll()
+                        while dbapi_conn.notifies:
+                            notify = dbapi_conn.notifies.pop(0)
+                            message = json.loads(notify.payload)
+                            self.deliver(message["user_id"], message["payload"])
+                finally:
+                    conn.invalidate()
+            except Exception as e:
+                print(f"❌ Notification listener error, reconnecting: {e}")
+                threading.Event().wait(5)
+
+
+BROKERS = {"local": LocalBroker, "postgres": PostgresBroker}
+
+broker = LocalBroker()
+
+
+def init_broker(app, listen=True):
+    """
+    Pick the broker from NOTIFICATION_BROKER ("local" or "postgres") and
+    start it. With listen=False (CLI commands) it can publish but runs no
+    listener thread, since no streams are served from this process.
+    """
+    global broker
+    name = app.config.get("NOTIFICATION_BROKER", "local")
+    if name not in BROKERS:
+        raise ValueError(f"Unknown NOTIFICATION_BROKER {name!r}, expected one of {sorted(BROKERS)}")
+    broker = BROKERS[name]()
+    with app.app_context():
+        broker.start(app, listen=listen)
+    return broker
+
+
+def notification_payload(notification):
+    created_at = notification.created_at
+    if created_at is not None and created_at.tzinfo is not None:
+        # Fresh rows still hold the aware default; match the naive UTC the feed returns
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        "id": notification.id,
+        "body": notification.body,
+        "created_at": created_at.isoformat() if created_at else None,
+        "read": bool(notification.read),
+    }
+
+
+# Notifications are published only once their transaction commits, so a
+# stream never shows a row that was rolled back. Payloads are captured at
+# flush time, when ids are known and the rows can still be read.
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_notifications(session, flush_context):
+    from .models import Notification
+
+    pending = session.info.setdefault("published_notifications", [])
+    for obj in session.new:
+        if isinstance(obj, Notification) and obj.receiver_id is not None:
+            pending.append((obj.receiver_id, notification_payload(obj)))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_new_notifications(session):
+    if session.in_nested_transaction():
+        return  # a savepoint released; wait for the real commit
+    for user_id, payload in session.info.pop("published_notifications", []):
+        try:
+            broker.publish(user_id, payload)
+        except Exception as e:
+            print(f"❌ Failed to publish notification {payload['id']}: {e}")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_new_notifications(session, previous_transaction):
+    if previous_transaction.nested:
+        return
+    session.info.pop("published_notifications", None)
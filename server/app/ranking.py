@@ -0,0 +1,90 @@
+import numpy as np
+from scipy import sparse
+from sqlalchemy import update
+from sqlalchemy.orm import load_only, selectinload
+
+from . import db
+from .recommendations import N_FEATURES, vectorize, job_fields, resume_fields, job_index
+
+
+def score_snapshots(job, snapshots):
+    """
+    Cosine similarity of each resume snapshot against the job's title,
+    skills and requirements, in one sparse matrix-vector product. IDF comes
+    from the live job corpus so common words ("team", "work") count for little.
+    """
+    if not snapshots:
+        return np.empty(0, dtype=np.float32)
+
+    job_index.sync()
+    idf = job_index.idf()
+    if idf is None:
+        idf = np.ones(N_FEATURES, dtype=np.float32)
+
+    j_idx, j_tf = vectorize(job_fields(job))
+    job_vec = np.zeros(N_FEATURES, dtype=np.float32)
+    job_vec[j_idx] = j_tf * idf[j_idx]
+    job_vec /= np.linalg.norm(job_vec) or 1.0
+
+    vectors = [vectorize(resume_fields(snapshot)) for snapshot in snapshots]
+    lengths = np.fromiter((len(v[0]) for v in vectors), dtype=np.int64, count=len(vectors))
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.concatenate([v[0] for v in vectors]) if indptr[-1] else np.empty(0, dtype=np.int32)
+    values = np.concatenate([v[1] for v in vectors]) if indptr[-1] else np.empty(0, dtype=np.float32)
+
+    weighted = values * idf[indices]
+    row_of = np.repeat(np.arange(len(vectors)), lengths)
+    norms = np.sqrt(np.bincount(row_of, weights=weighted * weighted, minlength=len(vectors)))
+    norms[norms == 0] = 1.0
+    weighted /= norms[row_of].astype(np.float32)
+
+    matrix = sparse.csr_matrix((weighted, indices, indptr), shape=(len(vectors), N_FEATURES))
+    return matrix @ job_vec
+
+
+def ensure_match_scores(job):
+    """
+    Score every application to `job` that doesn't have a match_score yet and
+    persist the results, so repeat views only read the stored column.
+    Returns the number of applications scored.
+    """
+    from .models import Application
+
+    pending = (
+        Application.query
+        .options(
+            load_only(Application.id, Application.resume_snapshot, Application.snapshot_digest),
+            selectinload(Application.snapshot),
+        )
+        .filter(Application.job_id == job.id, Application.match_score.is_(None))
+        .all()
+    )
+    if not pending:
+        return 0
+
+    # Applicants who sent the same resume share a digest, so score each distinct one once
+    snapshots = {}
+    for a in pending:
+        key = a.snapshot_digest or f"inline:{a.id}"
+        snapshots.setdefault(key, a.snapshot_data)
+    keys = list(snapshots)
+    score_by_key = dict(zip(keys, score_snapshots(job, [snapshots[k] for k in keys])))
+
+    db.session.execute(
+        update(Application),
+        [
+            {"id": a.id, "match_score": float(score_by_key[a.snapshot_digest or f"inline:{a.id}"])}
+            for a in pending
+        ],
+    )
+    db.session.commit()
+    return len(pending)
+
+
+def invalidate_match_scores(job_id):
+    """Drop stored scores for a job after its text changes; they are recomputed on the next ranked view."""
+    from .models import Application
+
+    Application.query.filter(Application.job_id == job_id).update(
+        {Application.match_score: None}, synchronize_session=False
+    )
@@ -0,0 +1,160 @@
+"""
+Token-bucket throttling for the credential and code endpoints. Each rule
+gives a client IP and a submitted email a bucket of `capacity` attempts
+that refills continuously over `period` seconds; a request takes one token
+from both, and is refused with 429 + Retry-After when either is empty.
+A bucket is two numbers (tokens, last update), so a check is O(1).
+
+Backends (RATE_LIMIT_BACKEND): "memory" keeps buckets per process, which
+is exact for a single worker; "database" shares them between workers and
+hosts through the rate_limit_buckets table.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from sqlalchemy import case, select
+from sqlalchemy.exc import IntegrityError
+
+from . import db
+
+
+# rule -> {scope: (capacity, period in seconds)}. The per-email bucket is what stops
+# guessing a 6-digit code; the per-IP one is looser since offices and campuses share IPs.
+RULES = {
+    "login": {"ip": (50, 300), "email": (10, 300)},
+    "send_code": {"ip": (20, 3600), "email": (5, 3600)},  # every hit sends an email
+    "verify_code": {"ip": (50, 600), "email": (10, 600)},
+}
+
+
+def _take(tokens, updated_at, capacity, period, now):
+    """Refill then try to take one token. Returns (new tokens, seconds until one is available or 0)."""
+    rate = capacity / period
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, math.ceil((1 - tokens) / rate)
+
+
+class MemoryBackend:
+    """Buckets in this process, least recently used dropped past MAX_KEYS (a dropped bucket was idle, so refilled)."""
+
+    MAX_KEYS = 100000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+
+    def take(self, key, capacity, period, now):
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens, retry_after = _take(tokens, updated_at, capacity, period, now)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.MAX_KEYS:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class DatabaseBackend:
+    """
+    Buckets in the rate_limit_buckets table. The refill-and-take is a
+    single conditional UPDATE, so concurrent workers can't both spend the
+    last token (no row lock needed, which SQLite wouldn't honour anyway).
+    Runs on a connection of its own so it never joins the request's
+    transaction. `flask prune-rate-limits` clears out idle rows.
+    """
+
+    def take(self, key, capacity, period, now):
+        from .models import RateLimitBucket
+
+        table = RateLimitBucket.__table__
+        refilled = table.c.tokens + (now - table.c.updated_at) * (capacity / period)
+        refilled = case((refilled > capacity, capacity), else_=refilled)
+
+        with db.engine.begin() as conn:
+            for _ in range(2):
+                taken = conn.execute(
+                    table.update()
+                    .where(table.c.key == key, refilled >= 1)
+                    .values(tokens=refilled - 1, updated_at=now)
+                )
+                if taken.rowcount:
+                    return 0
+
+                row = conn.execute(select(table.c.tokens, table.c.updated_at).where(table.c.key == key)).first()
+                if row is not None:
+                    # Empty bucket; it may have refilled a hair since the UPDATE, so wait at least a second
+                    return max(1, _take(row.tokens, row.updated_at, capacity, period, now)[1])
+
+                try:
+                    with conn.begin_nested():
+                        conn.execute(table.insert().values(key=key, tokens=capacity - 1, updated_at=now))
+                    return 0
+                except IntegrityError:
+                    continue  # another worker created it first; take from that row
+        return 0
+
+
+BACKENDS = {"memory": MemoryBackend, "database": DatabaseBackend}
+
+
+def get_backend():
+    """The configured backend, built once per app."""
+    backend = current_app.extensions.get("rate_limit_backend")
+    if backend is None:
+        name = current_app.config.get("RATE_LIMIT_BACKEND", "memory")
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND {name!r}, expected one of {sorted(BACKENDS)}")
+        backend = current_app.extensions["rate_limit_backend"] = BACKENDS[name]()
+    return backend
+
+
+def check(rule, ip, email=None):
+    """Take a token from each of the rule's buckets. Returns 0 if allowed, else seconds to wait."""
+    backend = get_backend()
+    now = time.time()
+    wait = 0
+    for scope, value in (("ip", ip), ("email", email)):
+        if not value:
+            continue
+        capacity, period = RULES[rule][scope]
+        wait = max(wait, backend.take(f"{rule}:{scope}:{value}", capacity, period, now))
+    return wait
+
+
+def rate_limited(rule):
+    """
+    Route decorator: throttle by client IP and by the request's "email"
+    field. Behind a proxy, wrap the app in werkzeug's ProxyFix so
+    remote_addr is the client's address.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current_app.config.get("RATE_LIMIT_ENABLED", True):
+                data = request.get_json(silent=True)
+                email = data.get("email") if isinstance(data, dict) else None
+                email = email.strip().lower() if isinstance(email, str) else None
+                retry_after = check(rule, request.remote_addr, email)
+                if retry_after:
+                    response = jsonify({"message": "Too many attempts. Please try again later."})
+                    response.headers["Retry-After"] = str(retry_after)
+                    return response, 429
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def prune_buckets(idle=86400):
+    """Delete database buckets untouched for `idle` seconds (longer than any rule's period, so they're full)."""
+    from .models import RateLimitBucket
+
+    deleted = RateLimitBucket.query.filter(RateLimitBucket.updated_at < time.time() - idle).delete(
+        synchronize_session=False
+    )
+    db.session.commit()
+    return deleted
@@ -0,0 +1,314 @@
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+
+from . import db
+
+
+# Terms are hashed into a fixed-size space so adding a job never changes the
+# vocabulary, which is what lets the index be updated one job at a time.
+N_FEATURES = 2 ** 18
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the
+their this to we will with you your us they them who what which about into
+""".split())
+
+# How much a hit in each field counts relative to a plain description word
+FIELD_WEIGHTS = {"title": 2.0, "skills": 3.0, "requirements": 1.5, "description": 1.0}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def _tokens(text):
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        token = token.rstrip(".")
+        if len(token) > 1 and token not in STOPWORDS:
+            yield token
+
+
+def _feature(term):
+    return zlib.crc32(term.encode()) % N_FEATURES
+
+
+def vectorize(fields):
+    """
+    {field: text or list of skills} -> (indices, values) of a hashed,
+    sublinear term-frequency vector. Skills also count as whole phrases so
+    "machine learning" matches better than "machine" + "learning".
+    """
+    counts = {}
+    for field, value in fields.items():
+        weight = FIELD_WEIGHTS.get(field, 1.0)
+        if isinstance(value, (list, tuple)):
+            phrases = [str(v) for v in value]
+            text = " ".join(phrases)
+            for phrase in phrases:
+                phrase = " ".join(phrase.lower().split())
+                if phrase:
+                    idx = _feature("skill:" + phrase)
+                    counts[idx] = counts.get(idx, 0.0) + weight
+        else:
+            text = value
+        for token in _tokens(text):
+            idx = _feature(token)
+            counts[idx] = counts.get(idx, 0.0) + weight
+
+    if not counts:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return indices, 1.0 + np.log(values)
+
+
+def job_fields(job):
+    skills = job.skills.split(",") if job.skills else []
+    return {
+        "title": job.title,
+        "skills": skills,
+        "requirements": job.requirements,
+        "description": job.description,
+    }
+
+
+def resume_fields(resume_data, skills=(), title=None, bio=None):
+    """Vectorizer fields for a resume builder JSON blob (Resume.data or Application.resume_snapshot)."""
+    resume_data = resume_data or {}
+    skills = list(skills or []) + [
+        s if isinstance(s, str) else s.get("name", "")
+        for s in resume_data.get("skills", []) or []
+    ]
+
+    experience = []
+    for item in resume_data.get("experience", []) or []:
+        if isinstance(item, dict):
+            experience.extend(str(v) for k, v in item.items() if k in ("title", "position", "company", "description"))
+
+    return {
+        "title": " ".join(filter(None, [title, resume_data.get("title")])),
+        "skills": skills,
+        "requirements": " ".join(experience),
+        "description": resume_data.get("summary") or bio or "",
+    }
+
+
+def seeker_fields(job_seeker, resume_data):
+    """Build the query side from JobSeeker.skills plus the resume builder's JSON."""
+    return resume_fields(resume_data, skills=job_seeker.skills, title=job_seeker.title, bio=job_seeker.bio)
+
+
+class JobVectorIndex:
+    """
+    In-memory TF-IDF matrix over active jobs.
+
+    Per-job term vectors are kept in a dict and updated one job at a time;
+    the weighted, L2-normalised CSC matrix is recompiled lazily (fully
+    vectorised) the next time someone queries after a change. Scoring is a
+    single sparse product over only the columns the query touches.
+    """
+
+    def __init__(self, sync_interval=30):
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._rows = {}                     # job_id -> (indices, tf values)
+        self._df = np.zeros(N_FEATURES, dtype=np.int32)
+        self._dirty = True
+        self._matrix = None                 # csc, shape (n_jobs, N_FEATURES)
+        self._job_ids = np.empty(0, dtype=np.int64)
+        self._idf = None
+        self._synced_at = None              # Job.updated_at high-water mark
+        self._checked_at = 0.0
+
+    # -- incremental updates -------------------------------------------------
+
+    def upsert(self, job_id, fields):
+        indices, values = vectorize(fields)
+        with self._lock:
+            old = self._rows.get(job_id)
+            if old is not None and np.array_equal(old[0], indices) and np.array_equal(old[1], values):
+                # Unchanged (a re-read at the sync high-water mark, a status-only edit): no recompile
+                return
+            self._drop(job_id)
+            self._rows[job_id] = (indices, values)
+            self._df[indices] += 1
+            self._dirty = True
+
+    def remove(self, job_id):
+        with self._lock:
+            if self._drop(job_id):
+                self._dirty = True
+
+    def _drop(self, job_id):
+        old = self._rows.pop(job_id, None)
+        if old is not None:
+            self._df[old[0]] -= 1
+        return old is not None
+
+    def __len__(self):
+        return len(self._rows)
+
+    # -- syncing with the database ---------------------------------------------
+
+    def sync(self, force=False):
+        """
+        Pull jobs changed since the last sync (by Job.updated_at) and drop
+        jobs that were deleted or are no longer active. Cheap to call per
+        request: it only hits the database every `sync_interval` seconds.
+        """
+        from .models import Job
+
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._checked_at < self.sync_interval:
+            return
+
+        with self._lock:
+            # Another thread (e.g. the startup warm-up) may have synced while we waited for the lock
+            if not force and self._synced_at is not None and time.monotonic() - self._checked_at < self.sync_interval:
+                return
+
+            query = Job.query
+            if self._synced_at is not None:
+                # >= so a job committed in the same instant as the last sync isn't missed
+                query = query.filter(Job.updated_at >= self._synced_at)
+
+            high_water = self._synced_at
+            for job in query.yield_per(1000):
+                if job.status == "active":
+                    self.upsert(job.id, job_fields(job))
+                else:
+                    self.remove(job.id)
+                if job.updated_at and (high_water is None or job.updated_at > high_water):
+                    high_water = job.updated_at
+
+            # Deletions leave no updated_at trail, so diff the id sets
+            active_ids = {job_id for (job_id,) in db.session.query(Job.id).filter(Job.status == "active")}
+            for job_id in set(self._rows) - active_ids:
+                self.remove(job_id)
+
+            self._synced_at = high_water or datetime.min
+            self._checked_at = time.monotonic()
+
+    def warm(self, app):
+        """
+        Load the whole corpus and compile the matrix in a background thread,
+        so the first recommendation request doesn't pay for it.
+        """
+        def load():
+            with app.app_context():
+                try:
+                    self.sync(force=True)
+                    self.idf()
+                except Exception as e:
+                    app.logger.error(f"❌ Recommendation index warm-up failed: {e}")
+                finally:
+                    db.session.remove()
+
+        thread = threading.Thread(target=load, name="job-index-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    # -- scoring ---------------------------------------------------------------
+
+    def _compile(self):
+        n = len(self._rows)
+        job_ids = np.fromiter(self._rows.keys(), dtype=np.int64, count=n)
+        if n == 0:
+            self._matrix, self._job_ids, self._idf = None, job_ids, None
+            self._dirty = False
+            return
+
+        rows = list(self._rows.values())
+        lengths = np.fromiter((len(r[0]) for r in rows), dtype=np.int64, count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.concatenate([r[0] for r in rows]) if indptr[-1] else np.empty(0, dtype=np.int32)
+        values = np.concatenate([r[1] for r in rows]) if indptr[-1] else np.empty(0, dtype=np.float32)
+
+        idf = (np.log((1.0 + n) / (1.0 + self._df)) + 1.0).astype(np.float32)
+        weighted = values * idf[indices]
+
+        # Row-wise L2 norms without leaving numpy
+        row_of = np.repeat(np.arange(n), lengths)
+        norms = np.sqrt(np.bincount(row_of, weights=weighted * weighted, minlength=n))
+        norms[norms == 0] = 1.0
+        weighted /= norms[row_of].astype(np.float32)
+
+        matrix = sparse.csr_matrix((weighted, indices, indptr), shape=(n, N_FEATURES))
+        self._matrix = matrix.tocsc()
+        self._job_ids = job_ids
+        self._idf = idf
+        self._dirty = False
+
+    def idf(self):
+        """Current IDF weights over the job corpus (None while the index is empty)."""
+        with self._lock:
+            if self._dirty:
+                self._compile()
+            return self._idf
+
+    def top_k(self, fields, k=10, exclude=()):
+        """Return [(job_id, cosine score), ...] best first."""
+        with self._lock:
+            if self._dirty:
+                self._compile()
+            matrix, job_ids, idf = self._matrix, self._job_ids, self._idf
+
+        if matrix is None or k <= 0:
+            return []
+
+        q_idx, q_tf = vectorize(fields)
+        if len(q_idx) == 0:
+            return []
+        q = q_tf * idf[q_idx]
+        q /= np.linalg.norm(q) or 1.0
+
+        # Only the columns the query touches take part in the product
+        scores = matrix[:, q_idx] @ q
+
+        if exclude:
+            scores[np.isin(job_ids, np.fromiter(exclude, dtype=np.int64))] = 0.0
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(job_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+# One index per worker process; other workers pick changes up on their next sync()
+job_index = JobVectorIndex()
+
+
+def refresh_job(job):
+    """Apply a just-committed job change to this worker's index right away."""
+    if job.status == "active":
+        job_index.upsert(job.id, job_fields(job))
+    else:
+        job_index.remove(job.id)
+
+
+def recommend_jobs(job_seeker, k=10, exclude_applied=True):
+    from .models import Resume, Application
+
+    resume = Resume.query.filter_by(owner_id=job_seeker.id).first()
+    resume_data = {}
+    if resume and resume.data:
+        try:
+            resume_data = json.loads(resume.data)
+        except json.JSONDecodeError:
+            resume_data = {}
+
+    exclude = set()
+    if exclude_applied:
+        exclude = {
+            job_id for (job_id,) in
+            db.session.query(Application.job_id).filter_by(applicant_id=job_seeker.id)
+        }
+
+    job_index.sync()
+    return job_index.top_k(seeker_fields(job_seeker, resume_data), k=k, exclude=exclude)
@@ -0,0 +1,334 @@
+import hashlib
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import requests
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from . import db
+
+
+STALE_CLAIM = timedelta(minutes=10)
+
+
+class ResumeParseError(Exception):
+    pass
+
+
+class ResumeParser:
+    """
+    Turns a resume file into the summary the registration flow needs:
+    {"name", "profession", "education", "skills", "experience"}.
+    Subclasses set `name` (part of the cache key) and implement parse().
+    """
+
+    name = None
+
+    def parse(self, path, content_type=None):
+        raise NotImplementedError
+
+
+class AffindaParser(ResumeParser):
+    name = "affinda"
+    URL = "https://api.affinda.com/v2/resumes"
+
+    def __init__(self, api_key=None, timeout=(5, 60)):
+        self.api_key = api_key or os.getenv("AFFINDA_API_KEY")
+        self.timeout = timeout
+
+    def parse(self, path, content_type=None):
+        with open(path, "rb") as f:
+            headers = {"Authorization": f"Bearer {self.api_key}"}
+            files = {"file": (os.path.basename(path), f, content_type)}
+            try:
+                response = requests.post(self.URL, headers=headers, files=files, timeout=self.timeout)
+            except requests.RequestException as e:
+                raise ResumeParseError(f"Affinda request failed: {e}")
+
+        if response.status_code != 200:
+            raise ResumeParseError(f"Affinda returned {response.status_code}: {response.text[:500]}")
+
+        parsed = response.json().get("data", {})
+        return {
+            "name": parsed.get("name"),
+            "profession": parsed.get("profession"),
+            "education": parsed.get("education", []),
+            "skills": parsed.get("skills", []),
+            "experience": parsed.get("totalYearsExperience"),
+        }
+
+
+class StubParser(ResumeParser):
+    """Offline stand-in for tests and local development: accepts any file and returns a fixed resume."""
+
+    name = "stub"
+
+    def parse(self, path, content_type=None):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return {
+            "name": stem.replace("_", " ").replace("-", " ").title() or "Test Applicant",
+            "profession": "Software Engineer",
+            "education": [{"organization": "Test University", "accreditation": {"education": "BSc"}}],
+            "skills": [{"name": "Python"}, {"name": "SQL"}],
+            "experience": 2,
+        }
+
+
+class LocalParser(ResumeParser):
+    """
+    Offline text extraction + heuristics (app/resume_text.py). PDF parsing
+    is CPU-bound, so it runs in a shared process pool rather than on a
+    thread that competes with request handling for the GIL.
+    """
+
+    name = "local"
+
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+
+    def parse(self, path, content_type=None):
+        from concurrent.futures import TimeoutError
+        from .resume_text import parse_file
+
+        future = get_process_pool().submit(parse_file, path, skill_vocabulary())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise ResumeParseError(f"Parsing took longer than {self.timeout}s")
+        except ImportError as e:
+            raise ResumeParseError(f"Local parser unavailable: {e}")
+        except Exception as e:
+            raise ResumeParseError(f"Could not read resume: {e}")
+
+
+PARSERS = {"affinda": AffindaParser, "local": LocalParser, "stub": StubParser}
+
+_process_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(processes=None):
+    """One process pool per web worker, created on first use (RESUME_PARSE_PROCESSES, default: CPU count)."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            if processes is None:
+                processes = current_app.config.get("RESUME_PARSE_PROCESSES") or None
+            _process_pool = ProcessPoolExecutor(max_workers=processes)
+        return _process_pool
+
+
+def skill_vocabulary():
+    """Canonical names from the skills table, falling back to a built-in list on an empty install."""
+    from .models import Skill
+    from .resume_text import DEFAULT_SKILLS
+
+    names = [name for (name,) in db.session.query(Skill.name)]
+    return tuple(names) if names else DEFAULT_SKILLS
+
+
+def get_parser():
+    """The parser named by RESUME_PARSER."""
+    name = current_app.config.get("RESUME_PARSER", "affinda")
+    if name not in PARSERS:
+        raise ValueError(f"Unknown RESUME_PARSER {name!r}, expected one of {sorted(PARSERS)}")
+    return PARSERS[name]()
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _validation_error(result):
+    # Soft validation (ignore confidence), same rule the synchronous endpoint used
+    if not result.get("name") or not result.get("profession") or not result.get("education"):
+        return "Uploaded file does not appear to be a valid resume."
+    return None
+
+
+def _finish(job, result):
+    """Record a parse result on the job and, if it looks like a resume, on the seeker's profile."""
+    from .models import JobSeeker
+
+    job.result = result
+    job.finished_at = _now()
+    job.locked_at = None
+    error = _validation_error(result)
+    if error:
+        job.status = "failed"
+        job.error = error
+        return
+    job.status = "done"
+    job_seeker = db.session.get(JobSeeker, job.owner_id)
+    if job_seeker:
+        job_seeker.cv_url = job.cv_url
+
+
+def enqueue_resume_parse(owner_id, file_path, cv_url, content_type=None, file_sha256=None):
+    """
+    Create a parse job for an uploaded file. If this exact file was parsed
+    before by the configured parser the cached result is applied right away
+    and the job comes back already finished. The caller commits.
+    """
+    from .models import ResumeParseJob, ParsedResume
+
+    file_sha256 = file_sha256 or sha256_file(file_path)
+    job = ResumeParseJob(
+        id=uuid.uuid4().hex,
+        owner_id=owner_id,
+        file_sha256=file_sha256,
+        file_path=file_path,
+        content_type=content_type,
+        cv_url=cv_url,
+        status="queued",
+    )
+    db.session.add(job)
+
+    cached = db.session.get(ParsedResume, (file_sha256, get_parser().name))
+    if cached:
+        _finish(job, cached.result)
+    return job
+
+
+def claim_parse_jobs(limit=5):
+    """
+    Claim queued jobs (and ones a crashed worker left running). Each is
+    taken with a conditional UPDATE that only matches while it is still
+    claimable, so two workers never parse the same file; on Postgres
+    SKIP LOCKED also spreads workers over different candidates.
+    """
+    from .models import ResumeParseJob
+
+    now = _now()
+    claimable = or_(
+        ResumeParseJob.status == "queued",
+        and_(ResumeParseJob.status == "running", ResumeParseJob.locked_at < now - STALE_CLAIM),
+    )
+    candidates = (
+        db.session.query(ResumeParseJob.id)
+        .filter(claimable)
+        .order_by(ResumeParseJob.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    claimed = []
+    for (job_id,) in candidates:
+        result = db.session.execute(
+            update(ResumeParseJob)
+            .where(ResumeParseJob.id == job_id, claimable)
+            .values(status="running", locked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            claimed.append(job_id)
+    db.session.commit()
+    if not claimed:
+        return []
+    return (
+        ResumeParseJob.query
+        .filter(ResumeParseJob.id.in_(claimed))
+        .order_by(ResumeParseJob.created_at)
+        .all()
+    )
+
+
+def run_parse_job(job, parser=None):
+    """Parse one claimed job, consulting and filling the SHA-256 result cache."""
+    from .models import ParsedResume
+
+    parser = parser or get_parser()
+    cached = db.session.get(ParsedResume, (job.file_sha256, parser.name))
+    if cached:
+        _finish(job, cached.result)
+        db.session.commit()
+        return job
+
+    try:
+        result = parser.parse(job.file_path, job.content_type)
+    except (ResumeParseError, OSError) as e:
+        job.status = "failed"
+        job.error = str(e)[:2000]
+        job.finished_at = _now()
+        job.locked_at = None
+        db.session.commit()
+        return job
+
+    # Another worker may have cached the same file meanwhile; keep whichever landed first
+    try:
+        with db.session.begin_nested():
+            db.session.add(ParsedResume(file_sha256=job.file_sha256, parser=parser.name, result=result))
+    except IntegrityError:
+        pass
+    _finish(job, result)
+    db.session.commit()
+    return job
+
+
+def process_parse_jobs():
+    """Run every queued parse job in this process. Returns the number processed."""
+    parser = get_parser()
+    total = 0
+    while True:
+        jobs = claim_parse_jobs()
+        if not jobs:
+            return total
+        for job in jobs:
+            run_parse_job(job, parser)
+        total += len(jobs)
+
+
+class ParseWorkerPool:
+    """Background threads that run queued parse jobs; notify() wakes one after an upload commits."""
+
+    def __init__(self, app, workers=2, poll_interval=5):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._run, name=f"resume-parser-{i}", daemon=True).start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    jobs = claim_parse_jobs(limit=1)
+                    if jobs:
+                        run_parse_job(jobs[0])
+                        continue
+            except Exception as e:
+                self.app.logger.error(f"❌ Resume parse worker error: {e}")
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+
+# Set by create_app when workers are enabled
+parse_pool = None
+
+
+def notify_parsers():
+    if parse_pool is not None:
+        parse_pool.notify()
@@ -0,0 +1,160 @@
+"""
+Offline resume parsing: pull the text out of a PDF and pick out the fields
+the registration flow uses with plain heuristics. Everything here is pure
+and picklable so it can run inside a process pool (see LocalParser in
+app/resume_parsing.py and `flask parse-resume-dir`).
+"""
+import os
+import re
+
+
+# Used when the skills table is empty (fresh install) or for the benchmark
+DEFAULT_SKILLS = (
+    "python", "java", "javascript", "typescript", "react", "node.js", "sql", "postgresql",
+    "mysql", "mongodb", "docker", "kubernetes", "aws", "azure", "gcp", "flask", "django",
+    "html", "css", "git", "linux", "c++", "c#", "go", "rust", "php", "swift", "kotlin",
+    "figma", "excel", "power bi", "tableau", "machine learning", "data analysis", "statistics",
+    "spss", "project management", "agile", "scrum", "communication", "leadership",
+    "marketing", "sales", "accounting", "photoshop", "illustrator", "autocad", "matlab",
+)
+
+SECTION_HEADINGS = {
+    "education": ("education", "education qualification", "educational qualification",
+                  "academic background", "academic qualification", "academics", "qualifications"),
+    "experience": ("experience", "work experience", "professional experience", "employment history",
+                   "work history", "employment", "career history"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "competencies", "expertise"),
+    "other": ("projects", "certifications", "awards", "languages", "interests", "hobbies",
+              "references", "personal information", "personal details", "summary", "profile",
+              "objective", "career objective", "publications", "volunteer", "activities"),
+}
+_HEADING_TO_SECTION = {h: section for section, headings in SECTION_HEADINGS.items() for h in headings}
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<!\w)(?:\+?\d[\d\s().-]{7,}\d)(?!\w)")
+YEAR_RANGE_RE = re.compile(
+    r"((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now)", re.IGNORECASE
+)
+LABEL_RE = re.compile(r"^\s*(name|full name)\s*[:\-]\s*(.+)$", re.IGNORECASE)
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def extract_text(path):
+    """Text of a PDF (via pypdf) or a plain text file. Scanned PDFs yield ''."""
+    if os.path.splitext(path)[1].lower() != ".pdf":
+        with open(path, "r", errors="ignore") as f:
+            return f.read()
+
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _normalize_heading(line):
+    return re.sub(r"[^a-z ]", "", line.lower()).strip()
+
+
+def split_sections(lines):
+    """{"header": [...], "education": [...], "experience": [...], ...} keyed by the heading lines found."""
+    sections = {"header": []}
+    current = "header"
+    for line in lines:
+        heading = _normalize_heading(line)
+        if heading in _HEADING_TO_SECTION and len(line) < 40:
+            current = _HEADING_TO_SECTION[heading]
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _looks_like_name(line):
+    words = line.split()
+    return (
+        1 < len(words) <= 5
+        and not any(ch.isdigit() for ch in line)
+        and "@" not in line
+        and all(w[0].isupper() for w in words if w[0].isalpha())
+        and _normalize_heading(line) not in _HEADING_TO_SECTION
+    )
+
+
+def find_name(lines):
+    for line in lines[:40]:
+        match = LABEL_RE.match(line)
+        if match:
+            return match.group(2).strip()
+    for line in lines[:10]:
+        if _looks_like_name(line):
+            return line.strip()
+    return None
+
+
+def find_skills(text, vocabulary):
+    """Skills from `vocabulary` (canonical, lower-case names) that appear in the text, as 1-3 word phrases."""
+    tokens = [t.rstrip(".") for t in _TOKEN_RE.findall(text.lower())]
+    found = []
+    seen = set()
+    for n in (3, 2, 1):
+        for i in range(len(tokens) - n + 1):
+            phrase = " ".join(tokens[i:i + n])
+            if phrase in vocabulary and phrase not in seen:
+                seen.add(phrase)
+                found.append(phrase)
+    return found
+
+
+def years_of_experience(lines):
+    """Sum of the year ranges found in the experience section (rough, overlapping ranges count twice)."""
+    from datetime import date
+
+    total = 0
+    for line in lines:
+        for start, end in YEAR_RANGE_RE.findall(line):
+            end_year = date.today().year if not end[:1].isdigit() else int(end)
+            total += max(0, end_year - int(start))
+    return total or None
+
+
+def parse_text(text, vocabulary=DEFAULT_SKILLS):
+    """Heuristic fields from resume text, in the same shape the other parsers return."""
+    vocabulary = frozenset(vocabulary)
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    sections = split_sections(lines)
+
+    name = find_name(lines)
+    profession = None
+    if name:
+        # The line under the name is usually the headline ("Data Analyst")
+        header = sections.get("header", [])
+        for i, line in enumerate(header[:-1]):
+            if name in line:
+                candidate = header[i + 1]
+                # Skip contact details and "Label : value" lines of bio-data style resumes
+                if ":" not in candidate and not EMAIL_RE.search(candidate) and not PHONE_RE.search(candidate):
+                    profession = candidate
+                break
+
+    if not profession and sections.get("experience"):
+        # Otherwise fall back to the most recent role, usually listed first
+        profession = YEAR_RANGE_RE.sub("", sections["experience"][0]).strip(" ,|-–") or None
+
+    email = EMAIL_RE.search(text)
+    phone = PHONE_RE.search(text)
+    return {
+        "name": name,
+        "profession": profession,
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0).strip() if phone else None,
+        "education": sections.get("education", []),
+        "skills": find_skills(text, vocabulary),
+        "experience": years_of_experience(sections.get("experience", [])),
+        "work_history": sections.get("experience", []),
+    }
+
+
+def parse_file(path, vocabulary=DEFAULT_SKILLS):
+    """Entry point for pool workers: path -> parsed fields."""
+    return parse_text(extract_text(path), vocabulary)
@@ -6,17 +6,30 @@ from .models import User
 from . import db
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
+from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, get_jwt, get_jwt_request_location
 from flask_cors import cross_origin
-from app.models import JobSeeker, Resume, Employer, Application, Job, Notification, Report, PendingUser
+from app.models import JobSeeker, Resume, Employer, Application, Job, Notification, Report, PendingUser, ResumeSnapshot
 import json
 from flask import send_from_directory
 from flask import Blueprint, request, jsonify, send_from_directory, current_app
 from datetime import date
+from sqlalchemy.orm import joinedload
+from app.counters import adjust_job_counter, release_seeker_activity
+from app.search import index_job, index_employer_jobs, remove_job, search_job_ids
+from app.skills import set_job_skills, set_seeker_skills, job_ids_with_skills, parse_skill_list
+from app.recommendations import recommend_jobs, refresh_job, job_index
+from app.ranking import invalidate_match_scores
+from app.snapshots import store_snapshot
+from app.notifications import create_notification, mark_all_read, unread_count
+from app.storage import save_upload, add_ref, reference_url, get_storage, release_owner, collect_garbage
+from app.images import pick_variant, variants_for_url, queue_variants
 from app.auth.decorators import admin_required
-from app.auth.email_utils import send_verification_email
+from app.auth.tokens import issue_access_token, revoke_tokens, issue_stream_token, STREAM_SCOPE, STREAM_TOKEN_TTL
+from app.rate_limit import rate_limited
+from app.auth.email_utils import queue_verification_email
 import random
-from app.auth.email_utils import send_reset_email
+from app.auth.email_utils import queue_reset_email
+from app.email_outbox import notify_outbox
 from random import randint
 
 
@@ -58,6 +71,7 @@ def index():
 #     }), 200
 
 @main.route("/login", methods=["POST"])
+@rate_limited("login")
 def login():
     data = request.get_json()
     email = data.get("email")
@@ -68,13 +82,15 @@ def login():
     # Step 1: Validate credentials
     if user is None or not user.check_password(password):
         return jsonify({"message": "Invalid email or password"}), 401
+    if db.session.is_modified(user):
+        db.session.commit()  # hash upgraded to the current parameters
 
     # ✅ Step 2: Check if email is verified
     if not user.is_verified:
         return jsonify({"message": "Please verify your email before logging in."}), 403
 
-    # Step 3: Generate access token
-    access_token = create_access_token(identity=str(user.id))
+    # Step 3: Generate access token (role and verification travel as claims)
+    access_token = issue_access_token(user)
 
     return jsonify({
         "message": "Login successful",
@@ -240,6 +256,7 @@ def login():
 
 @main.route("/send-verification-code", methods=["POST"])
 @cross_origin(origin="http://localhost:5173", supports_credentials=True)
+@rate_limited("send_code")
 def send_verification_code():
     from datetime import datetime, timedelta, timezone
     data = request.get_json()
@@ -282,15 +299,12 @@ def send_verification_code():
         pending_user.set_password(password)
         db.session.add(pending_user)
 
+    # ✅ Queue the email in the same transaction; outbox workers deliver it (with retries)
+    queue_verification_email(email, code)
     db.session.commit()
+    notify_outbox()
 
-    # ✅ Send real email using SMTP
-    try:
-        send_verification_email(email, code)
-        return jsonify({"message": "Verification code sent to your email."}), 200
-    except Exception as e:
-        current_app.logger.error(f"❌ Failed to send email to {email}: {e}")
-        return jsonify({"error": "Failed to send verification email."}), 500
+    return jsonify({"message": "Verification code sent to your email."}), 200
 
 
 
@@ -329,21 +343,22 @@ def apply():
     if not job:
         return jsonify({"error": "Invalid job ID"}), 400
 
-    # Create the application with cv_url
+    # Create the application with cv_url; identical resumes are stored once
     application = Application(
         applicant_id=applicant_id,
         job_id=job_id,
-        resume_snapshot=resume_snapshot,
+        snapshot_digest=store_snapshot(resume_snapshot),
         cv_url=cv_url  # ✅ Add this line
     )
     db.session.add(application)
+    adjust_job_counter(job.id, "applicant_count", 1)
+    reference_url(cv_url, applicant.id, "cv")
 
     # Create notification
-    notification = Notification(
+    create_notification(
         receiver_id=job.employer_id,
         body=f"{applicant.full_name} has applied for your job post: '{job.title}'"
     )
-    db.session.add(notification)
 
     db.session.commit()
 
@@ -361,22 +376,116 @@ def apply():
 @main.route("/notifications/<int:user_id>", methods=["GET"])
 def get_notifications(user_id):
     from .models import Notification
-    from app import db
+    from app.pagination import keyset_paginate, parse_page_size, InvalidCursor
 
-    notifications = Notification.query.filter_by(receiver_id=user_id).order_by(Notification.created_at.desc()).all()
+    limit = parse_page_size(request.args.get("limit"))
+    try:
+        notifications, next_cursor = keyset_paginate(
+            Notification.query.filter_by(receiver_id=user_id),
+            Notification.created_at, Notification.id,
+            cursor=request.args.get("cursor"),
+            limit=limit,
+        )
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
 
     return jsonify({
         "notifications": [ 
             {
                 "id": n.id,
                 "body": n.body,
-                "created_at": n.created_at.isoformat(),
+                "created_at": n.created_at.isoformat() if n.created_at else None,
                 "read": n.read 
             } for n in notifications
+        ],
+        "next_cursor": next_cursor,
+        "limit": limit,
+    })
+
+
+@main.route("/notifications/stream-token", methods=["POST"])
+@jwt_required()
+def create_stream_token():
+    user = User.query.get(get_jwt_identity())
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    return jsonify({
+        "token": issue_stream_token(user),
+        "expires_in": int(STREAM_TOKEN_TTL.total_seconds()),
+    })
+
+
+@main.route("/notifications/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_notifications():
+    """
+    Server-Sent Events feed of the caller's new notifications. Browsers
+    reconnect on their own and send Last-Event-ID, which replays anything
+    created while they were away. Each open stream holds a worker thread,
+    so run gunicorn with a threaded or gevent worker class. EventSource
+    can't set headers, so browsers pass a token from /notifications/stream-token
+    as ?jwt=; full access tokens are refused there.
+    """
+    import queue
+    from flask import Response
+    from .models import Notification
+    from app import pubsub
+
+    if get_jwt_request_location() == "query_string" and get_jwt().get("scope") != STREAM_SCOPE:
+        return jsonify({"msg": "Use a stream token in the query string"}), 401
+
+    user_id = int(get_jwt_identity())
+    keepalive = current_app.config.get("NOTIFICATION_STREAM_KEEPALIVE_SECONDS", 15)
+
+    # Subscribe before the replay query so nothing slips in between
+    subscription = pubsub.broker.subscribe(user_id)
+    missed = []
+    last_event_id = request.headers.get("Last-Event-ID", type=int)
+    if last_event_id is not None:
+        missed = [
+            pubsub.notification_payload(n) for n in
+            Notification.query
+            .filter(Notification.receiver_id == user_id, Notification.id > last_event_id)
+            .order_by(Notification.id)
+            .limit(100)
         ]
+    # Don't hold a pooled connection for the lifetime of the stream
+    db.session.close()
+
+    def format_event(payload):
+        return f"id: {payload['id']}\nevent: notification\ndata: {json.dumps(payload)}\n\n"
+
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            replayed = {payload["id"] for payload in missed}
+            for payload in missed:
+                yield format_event(payload)
+            while True:
+                try:
+                    payload = subscription.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if payload["id"] not in replayed:
+                    yield format_event(payload)
+        finally:
+            pubsub.broker.unsubscribe(user_id, subscription)
+
+    return Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx: flush each event instead of buffering
     })
 
 
+@main.route("/notifications/<int:user_id>/unread-count", methods=["GET"])
+def get_unread_notification_count(user_id):
+    count = unread_count(user_id)
+    if count is None:
+        return jsonify({"error": "User not found"}), 404
+    return jsonify({"unread_count": count})
+
+
 
 ############
 # Get applications for a job Route
@@ -393,7 +502,7 @@ def get_applications(jobseeker_id):
                 "job_title": app.job.title,
                 "company": app.job.employer.name,
                 "applied_at": app.applied_at,
-                "resume": app.resume_snapshot
+                "resume": app.snapshot_data
             } for app in apps
         ]
     })
@@ -450,17 +559,15 @@ def get_applications_by_user():
 # Resume Upload and Check Route
 # ###########
 
-load_dotenv()
-AFFINDA_API_KEY = os.getenv("AFFINDA_API_KEY")
-
-
 @main.route("/upload-resume", methods=["POST"])
 @jwt_required()
 def upload_resume():
-    from app import db
-    from .models import JobSeeker
-    from flask import request
-    import os
+    """
+    Save the resume and queue it for parsing. Returns a job id right away;
+    poll GET /upload-resume/<job_id> for the result. Files that were parsed
+    before (same SHA-256) come back already finished from the cache.
+    """
+    from app.resume_parsing import enqueue_resume_parse, notify_parsers
 
     if 'file' not in request.files:
         return jsonify({"error": "No file part"}), 400
@@ -469,57 +576,38 @@ def upload_resume():
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
 
-    filename = secure_filename(file.filename)
-    upload_path = os.path.join("uploads", filename)
-    file.save(upload_path)
+    owner_id = int(get_jwt_identity())
+    blob = save_upload(file, owner_id=owner_id, purpose="cv")
+    storage = get_storage()
 
     # Generate full URL for the file
-    base_url = request.host_url.rstrip("/")  # e.g., "http://localhost:8000"
-    full_url = f"{base_url}/uploads/{filename}"
-
-    # Call Affinda API
-    with open(upload_path, 'rb') as f:
-        headers = { "Authorization": f"Bearer {AFFINDA_API_KEY}" }
-        files = { "file": (filename, f, file.content_type) }
-        response = requests.post("https://api.affinda.com/v2/resumes", headers=headers, files=files)
-
-    data = response.json()
-    if response.status_code != 200:
-        return jsonify({"error": "Resume parsing failed", "affinda_response": data}), response.status_code
-
-    parsed = data.get("data", {})
-    name = parsed.get("name")
-    profession = parsed.get("profession")
-    education = parsed.get("education", [])
-    skills = parsed.get("skills", [])
-    experience = parsed.get("totalYearsExperience")
-
-    # Soft validation (ignore confidence)
-    if not name or not profession or not education:
-        return jsonify({
-            "error": "Uploaded file does not appear to be a valid resume.",
-            "found_name": name,
-            "found_profession": profession,
-            "education": education,
-            "skills": skills
-        }), 400
-
-    # Save to user profile
-    user_id = get_jwt_identity()
-    job_seeker = JobSeeker.query.get(user_id)
-    if job_seeker:
-        job_seeker.cv_url = full_url  # Save the full URL
-        db.session.commit()
+    full_url = storage.url(blob.key)
+    if full_url.startswith("/"):
+        full_url = request.host_url.rstrip("/") + full_url  # e.g., "http://localhost:8000/uploads/..."
+
+    job = enqueue_resume_parse(
+        owner_id=owner_id,
+        file_path=storage.local_path(blob.key),
+        cv_url=full_url,
+        content_type=file.content_type,
+        file_sha256=blob.sha256,
+    )
+    db.session.commit()
+    if job.status == "queued":
+        notify_parsers()
 
-    return jsonify({
-        "message": "Resume parsed successfully ✅",
-        "cv_url": full_url,  # Return the full URL
-        "name": name,
-        "profession": profession,
-        "skills": skills,
-        "education": education,
-        "experience": experience
-    }), 200
+    return jsonify(job.to_dict()), 202 if job.status == "queued" else 200
+
+
+@main.route("/upload-resume/<job_id>", methods=["GET"])
+@jwt_required()
+def get_resume_parse_job(job_id):
+    from .models import ResumeParseJob
+
+    job = db.session.get(ResumeParseJob, job_id)
+    if not job or job.owner_id != int(get_jwt_identity()):
+        return jsonify({"error": "Parse job not found"}), 404
+    return jsonify(job.to_dict()), 200
 
 
 
@@ -548,6 +636,7 @@ def save_resume():
         if job_seeker:
             job_seeker.cv_url = cv_url
             db.session.add(job_seeker)
+            reference_url(cv_url, job_seeker.id, "cv")
 
     db.session.commit()
 
@@ -575,21 +664,60 @@ def load_resume():
 # Get all jobs Route
 #############
 
+def _parse_bool(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
 @main.route("/jobs", methods=["GET"])
 def get_all_jobs():
     from .models import Job, Employer
     from datetime import date
     from app import db
+    from app.pagination import keyset_paginate, parse_page_size, InvalidCursor
+
+    query = Job.query.options(joinedload(Job.employer))
+
+    # Server-side filters (all optional)
+    job_type = request.args.get("job_type")
+    if job_type:
+        query = query.filter(db.func.lower(Job.job_type) == job_type.strip().lower())
+
+    is_remote = request.args.get("is_remote")
+    if is_remote is not None and is_remote != "":
+        query = query.filter(Job.is_remote == _parse_bool(is_remote))
+
+    status = request.args.get("status")
+    if status:
+        query = query.filter(Job.status == status)
+
+    location = request.args.get("location")
+    if location:
+        query = query.filter(Job.location.ilike(f"%{location.strip()}%"))
+
+    employer_id = request.args.get("employer_id", type=int)
+    if employer_id is not None:
+        query = query.filter(Job.employer_id == employer_id)
+
+    # ?skills=python,sql&skills_match=any|all  (indexed lookup via job_skills)
+    skills = parse_skill_list(request.args.get("skills"))
+    if skills:
+        match = "all" if request.args.get("skills_match") == "all" else "any"
+        query = query.filter(Job.id.in_(job_ids_with_skills(skills, match=match)))
+
+    limit = parse_page_size(request.args.get("limit"))
+    try:
+        jobs, next_cursor = keyset_paginate(
+            query, Job.created_at, Job.id,
+            cursor=request.args.get("cursor"),
+            limit=limit,
+        )
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
 
-    jobs = Job.query.all()
     job_list = []
-    updated = False
 
+    # Deadline expiry is handled by the background sweeper (app/expiry.py)
     for job in jobs:
-        if job.deadline and job.deadline < date.today() and job.status != "expired":
-            job.status = "expired"
-            updated = True
-
         employer = job.employer
 
         job_list.append({
@@ -603,20 +731,67 @@ def get_all_jobs():
             "salary": job.salary,
             "deadline": job.deadline.strftime("%Y-%m-%d") if job.deadline else None,
             "company_name": employer.company_name if employer else "Unknown",
-            "company_logo": employer.logo_url if employer else None,
+            "company_logo": pick_variant(employer.logo_variants, employer.logo_url) if employer else None,
+            "company_logo_variants": employer.logo_variants if employer else None,
             "posted_date": job.created_at.strftime("%Y-%m-%d") if job.created_at else None,
             "skills": job.skills.split(",") if job.skills else [],
             "status": job.status
         })
 
-    if updated:
-        db.session.commit()
+    return jsonify({
+        "jobs": job_list,
+        "next_cursor": next_cursor,
+        "limit": limit
+    }), 200
+
+
+
+
+
+
+############
+# Search jobs Route
+#############
+
+@main.route("/jobs/search", methods=["GET"])
+def search_jobs():
+    from .models import Job
+    from app.pagination import parse_page_size
+    from app.serializers import serialize_jobs
+
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "Missing search query"}), 400
+
+    limit = parse_page_size(request.args.get("limit"))
+    offset = max(request.args.get("offset", 0, type=int), 0)
 
-    return jsonify(job_list), 200
+    # Ask for one extra hit to know whether there is a next page
+    hits = search_job_ids(q, limit=limit + 1, offset=offset)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
 
+    job_ids = [job_id for job_id, _ in hits]
+    jobs_by_id = {
+        job.id: job for job in
+        Job.query.options(joinedload(Job.employer)).filter(Job.id.in_(job_ids)).all()
+    }
 
+    results = []
+    for job_id, score in hits:
+        job = jobs_by_id.get(job_id)
+        if job:
+            results.append((job, score))
 
+    jobs = serialize_jobs([job for job, _ in results])
+    for job_dict, (_, score) in zip(jobs, results):
+        job_dict["score"] = score
 
+    return jsonify({
+        "jobs": jobs,
+        "next_offset": offset + limit if has_more else None,
+        "limit": limit
+    }), 200
 
 
 ###############
@@ -657,8 +832,13 @@ def create_job():
         employer_id=employer_id
     )
 
+    set_job_skills(new_job, data.get("skills"))
+
     db.session.add(new_job)
+    db.session.flush()  # assign new_job.id so the search index can reference it
+    index_job(new_job.id)
     db.session.commit()
+    refresh_job(new_job)
 
     return jsonify({"message": "Job created successfully", "job_id": new_job.id}), 201
 
@@ -670,22 +850,31 @@ def create_job():
 @main.route("/employer/<int:employer_id>/jobs", methods=["GET"])
 def get_employer_jobs(employer_id):
     from .models import Job
-    from datetime import date
-    from app import db
+    from app.serializers import serialize_jobs
 
-    jobs = Job.query.filter_by(employer_id=employer_id).all()
-    updated = False
+    query = (
+        Job.query
+        .options(joinedload(Job.employer))
+        .filter_by(employer_id=employer_id)
+    )
 
-    for job in jobs:
-        if job.deadline and job.deadline < date.today() and job.status != "expired":
-            job.status = "expired"
-            updated = True
+    # Popularity filters/sorting read the denormalized counters, no aggregate scan
+    min_applicants = request.args.get("min_applicants", type=int)
+    if min_applicants is not None:
+        query = query.filter(Job.applicant_count >= min_applicants)
 
-    if updated:
-        db.session.commit()
+    sort = request.args.get("sort")
+    if sort == "applicants":
+        query = query.order_by(Job.applicant_count.desc(), Job.id.desc())
+    elif sort == "saved":
+        query = query.order_by(Job.saved_count.desc(), Job.id.desc())
+    elif sort == "newest":
+        query = query.order_by(Job.created_at.desc(), Job.id.desc())
+
+    jobs = query.all()
 
     return jsonify({
-        "jobs": [job.to_dict(include_applicant_count=True) for job in jobs]
+        "jobs": serialize_jobs(jobs)
     })
 
 
@@ -748,19 +937,56 @@ def get_resume():
 @main.route("/job-seeker/<int:seeker_id>/applied-jobs", methods=["GET"])
 def get_applied_jobs(seeker_id):
     from .models import Application, Job
-    applications = Application.query.filter_by(applicant_id=seeker_id).all()
+    from app.serializers import serialize_jobs
 
-    seen_job_ids = set()
+    applied_job_ids = [
+        job_id for (job_id,) in
+        db.session.query(Application.job_id)
+        .filter_by(applicant_id=seeker_id)
+        .order_by(Application.id)
+        .all()
+    ]
+
+    jobs_by_id = {
+        job.id: job for job in
+        Job.query.options(joinedload(Job.employer)).filter(Job.id.in_(applied_job_ids)).all()
+    }
+
+    # Keep the order the seeker applied in, one entry per job
     jobs = []
+    for job_id in dict.fromkeys(applied_job_ids):
+        if job_id in jobs_by_id:
+            jobs.append(jobs_by_id[job_id])
+
+    return jsonify(serialize_jobs(jobs)), 200
+
+
+@main.route("/job-seeker/<int:seeker_id>/recommended-jobs", methods=["GET"])
+def get_recommended_jobs(seeker_id):
+    from .models import JobSeeker, Job
+    from app.serializers import serialize_jobs
+
+    job_seeker = JobSeeker.query.get(seeker_id)
+    if not job_seeker:
+        return jsonify({"error": "Job seeker not found"}), 404
+
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    ranked = recommend_jobs(job_seeker, k=limit)
 
-    for application in applications:
-        if application.job_id not in seen_job_ids:
-            job = Job.query.get(application.job_id)
-            if job:
-                jobs.append(job.to_dict())
-                seen_job_ids.add(application.job_id)
+    jobs_by_id = {
+        job.id: job for job in
+        Job.query.options(joinedload(Job.employer)).filter(Job.id.in_([job_id for job_id, _ in ranked])).all()
+    }
+
+    matches = [
+        (jobs_by_id[job_id], score) for job_id, score in ranked
+        if job_id in jobs_by_id and jobs_by_id[job_id].status == "active"
+    ]
+    results = serialize_jobs([job for job, _ in matches])
+    for job_dict, (_, score) in zip(results, matches):
+        job_dict["match_score"] = score
 
-    return jsonify(jobs), 200
+    return jsonify({"jobs": results}), 200
 
 
 @main.route("/save", methods=["POST"])
@@ -782,6 +1008,7 @@ def save_job():
     saved = SavedJob(job_id=job_id, seeker_id=seeker_id)
 
     db.session.add(saved)
+    adjust_job_counter(job_id, "saved_count", 1)
     db.session.commit()
 
     return jsonify({"message": "Job saved successfully"}), 201
@@ -790,10 +1017,16 @@ def save_job():
 @main.route("/job-seeker/<int:seeker_id>/saved-jobs", methods=["GET"])
 def get_saved_jobs(seeker_id):
     from .models import SavedJob, Job
-    saved = SavedJob.query.filter_by(seeker_id=seeker_id).all()
-    job_ids = [s.job_id for s in saved]
-    jobs = Job.query.filter(Job.id.in_(job_ids)).all()
-    return jsonify([j.to_dict() for j in jobs])
+    from app.serializers import serialize_jobs
+
+    saved_job_ids = db.session.query(SavedJob.job_id).filter_by(seeker_id=seeker_id)
+    jobs = (
+        Job.query
+        .options(joinedload(Job.employer))
+        .filter(Job.id.in_(saved_job_ids))
+        .all()
+    )
+    return jsonify(serialize_jobs(jobs))
 
 
 
@@ -813,6 +1046,7 @@ def unsave_job():
 
     if saved:
         db.session.delete(saved)
+        adjust_job_counter(saved.job_id, "saved_count", -1)
         db.session.commit()
         return jsonify({"message": "Job unsaved successfully"}), 200
     else:
@@ -931,7 +1165,9 @@ def save_job_seeker_profile():
     job_seeker.bio = bio
     if profile_pic_url:
         job_seeker.profile_picture = profile_pic_url
-    job_seeker.skills = skills
+        job_seeker.profile_picture_variants = variants_for_url(profile_pic_url)
+        reference_url(profile_pic_url, user.id, "profile_picture", replace=True)
+    set_seeker_skills(job_seeker, skills)
     job_seeker.education = education
 
     db.session.add(user)
@@ -964,25 +1200,17 @@ def upload_profile_picture():
         return jsonify({"error": "No selected file"}), 400
 
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        os.makedirs(upload_folder, exist_ok=True)  # Ensure folder exists
-
-        filepath = os.path.join(upload_folder, filename)
-        file.save(filepath)
+        # Not tied to a user yet (registration); the profile save claims it
+        blob = save_upload(file)
+        db.session.commit()
+        if not blob.variants:
+            queue_variants(blob.key)
 
         # Return relative URL to access the image later
-        return jsonify({"url": f"/uploads/{filename}"}), 201
+        return jsonify({"url": get_storage().url(blob.key)}), 201
 
     return jsonify({"error": "Invalid file type"}), 400
 
-from flask import send_from_directory
-# ✅ Serve uploaded files route
-@main.route('/uploads/<filename>')
-def uploaded_file(filename):
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
-
-
 @main.route("/job-seeker/profile", methods=["GET"])
 @jwt_required()
 def get_job_seeker_profile():
@@ -1002,6 +1230,7 @@ def get_job_seeker_profile():
         "phone": job_seeker.phone,
         "address": job_seeker.address,
         "profile_pic_url": job_seeker.profile_picture, 
+        "profile_pic_variants": job_seeker.profile_picture_variants,
         "skills": job_seeker.skills,
         "education": job_seeker.education,
         "bio": job_seeker.bio 
@@ -1022,25 +1251,145 @@ def get_job(job_id):
 
 
 
-from sqlalchemy.orm import joinedload
 @main.route("/jobs/<int:job_id>/applicants", methods=["GET"])
 def get_applicants_for_job(job_id):
-    from .models import Application
+    from .models import Application, Job
+    from app.pagination import parse_page_size
+    from app.ranking import ensure_match_scores
+
+    job = Job.query.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
 
-    applicants = (
+    limit = parse_page_size(request.args.get("limit"))
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    sort = request.args.get("sort")
+
+    query = (
         Application.query
-        .options(joinedload(Application.job_seeker))
+        .options(joinedload(Application.job_seeker).joinedload(JobSeeker.user))
         .filter_by(job_id=job_id)
-        .all()
     )
 
-    return jsonify([a.to_dict() for a in applicants]), 200
+    if sort == "match":
+        # Scores are computed once (batched) and stored; later views just read them
+        ensure_match_scores(job)
+        query = query.order_by(Application.match_score.desc(), Application.id)
+    else:
+        query = query.order_by(Application.applied_at, Application.id)
 
+    applicants = query.offset(offset).limit(limit + 1).all()
+    has_more = len(applicants) > limit
+    applicants = applicants[:limit]
 
+    return jsonify({
+        "applicants": [a.to_summary_dict() for a in applicants],
+        "next_offset": offset + limit if has_more else None,
+        "limit": limit
+    }), 200
 
 
 
 
+
+
+class _EchoBuffer:
+    """File-like object whose write() just returns the line, so csv.writer can feed a generator."""
+    def write(self, value):
+        return value
+
+
+EXPORT_COLUMNS = ["application_id", "applicant_id", "name", "email", "applied_at", "cv_url", "match_score", "skills", "snapshot_digest"]
+
+
+@main.route("/jobs/<int:job_id>/applicants/export", methods=["GET"])
+def export_applicants(job_id):
+    import csv
+    from flask import Response, stream_with_context
+    from sqlalchemy import select
+    from .models import Application, Job, ResumeSnapshot
+    from app.snapshots import snapshot_digest
+
+    export_format = request.args.get("format", "csv")
+    if export_format not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    if not Job.query.get(job_id):
+        return jsonify({"error": "Job not found"}), 404
+
+    stmt = (
+        select(
+            Application.id, Application.applicant_id, Application.applied_at,
+            Application.cv_url, Application.match_score, Application.resume_snapshot,
+            Application.snapshot_digest, ResumeSnapshot.data.label("stored_snapshot"),
+            JobSeeker.full_name, JobSeeker.cv_url.label("seeker_cv_url"), User.email,
+        )
+        .outerjoin(ResumeSnapshot, ResumeSnapshot.digest == Application.snapshot_digest)
+        .outerjoin(JobSeeker, JobSeeker.id == Application.applicant_id)
+        .outerjoin(User, User.id == JobSeeker.id)
+        .where(Application.job_id == job_id)
+        .order_by(Application.applied_at, Application.id)
+        # Server-side cursor: rows are fetched in chunks as the client reads
+        .execution_options(yield_per=500)
+    )
+
+    def rows():
+        for row in db.session.execute(stmt):
+            snapshot = row.stored_snapshot or row.resume_snapshot or {}
+            skills = snapshot.get("skills") or []
+            yield {
+                "application_id": row.id,
+                "applicant_id": row.applicant_id,
+                "name": row.full_name or "Unknown",
+                "email": row.email or "N/A",
+                "applied_at": row.applied_at.isoformat() if row.applied_at else None,
+                "cv_url": row.seeker_cv_url or row.cv_url,
+                "match_score": row.match_score,
+                "skills": skills,
+                "snapshot_digest": row.snapshot_digest or snapshot_digest(snapshot),
+                "resume_snapshot": snapshot,
+            }
+
+    def generate_csv():
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(EXPORT_COLUMNS)
+        for row in rows():
+            row["skills"] = "; ".join(s if isinstance(s, str) else str(s.get("name", "")) for s in row["skills"])
+            yield writer.writerow([row[c] for c in EXPORT_COLUMNS])
+
+    def generate_ndjson():
+        for row in rows():
+            yield json.dumps(row, default=str) + "\n"
+
+    if export_format == "csv":
+        body, mimetype = generate_csv(), "text/csv"
+    else:
+        body, mimetype = generate_ndjson(), "application/x-ndjson"
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=job-{job_id}-applicants.{export_format}"},
+    )
+
+
+@main.route("/applications/<int:application_id>", methods=["GET"])
+def get_application(application_id):
+    from .models import Application
+
+    application = (
+        Application.query
+        .options(joinedload(Application.job_seeker).joinedload(JobSeeker.user))
+        .filter_by(id=application_id)
+        .first()
+    )
+    if not application:
+        return jsonify({"error": "Application not found"}), 404
+
+    return jsonify(application.to_dict()), 200
+
+
+
 # from flask_login import current_user  # optional if using session or other method
 
 
@@ -1062,6 +1411,8 @@ def update_employer_info():
 
     employer.company_name = company_name
     employer.company_desc = company_desc
+    db.session.flush()
+    index_employer_jobs(employer.id)  # company name is part of the search document
     db.session.commit()
 
     return jsonify({"message": "Employer info updated"}), 200
@@ -1086,30 +1437,31 @@ def upload_employer_image():
 
     file = request.files['file']
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        file.save(filepath)
-
         employer = Employer.query.get(user_id)
         if not employer:
             return jsonify({'error': 'Employer not found'}), 404
 
         image_type = request.form.get('image_type')  # instead of 'type'
+        if image_type not in ('logo', 'banner'):
+            return jsonify({'error': 'Invalid image type'}), 400
+
+        blob = save_upload(file)
+        add_ref(blob.key, employer.id, image_type, replace=True)
+        url = get_storage().url(blob.key)
 
+        # Thumbnails carry over when the same image was uploaded before, otherwise they're built after commit
         if image_type == 'logo':
-            employer.logo_url = f'/uploads/{filename}'
-        elif image_type == 'banner':
-            employer.banner_url = f'/uploads/{filename}'
+            employer.logo_url = url
+            employer.logo_variants = variants_for_url(url)
         else:
-            return jsonify({'error': 'Invalid image type'}), 400
+            employer.banner_url = url
+            employer.banner_variants = variants_for_url(url)
 
         db.session.commit()
-        print('Received file:', file.filename if file else None)
-        print('Received user_id:', user_id)
-        print('Received image_type:', request.form.get('image_type'))
+        if not blob.variants:
+            queue_variants(blob.key)
 
-        return jsonify({'message': 'Image uploaded', 'url': f'/uploads/{filename}'}), 200
+        return jsonify({'message': 'Image uploaded', 'url': url}), 200
 
     return jsonify({'error': 'Invalid file format'}), 400
 
@@ -1187,6 +1539,8 @@ def get_employer_profile():
         'company_desc': employer.company_desc,
         'logo_url': employer.logo_url,
         'banner_url': employer.banner_url,
+        'logo_variants': employer.logo_variants,
+        'banner_variants': employer.banner_variants,
         'founded_year': employer.founded_year,
         'employees': employer.num_employees,
         'funding': employer.funding,
@@ -1216,13 +1570,15 @@ def update_job(job_id):
     job.salary = data.get("salary", job.salary)
     job.deadline = data.get("deadline", job.deadline)
 
-    # Convert list of skills to a comma-separated string if necessary
-    if isinstance(data.get("skills"), list):
-        job.skills = ",".join(data["skills"])
-    elif data.get("skills") is not None:
-        job.skills = data["skills"]  # fallback if sent as string
+    # Accepts a list or a comma-separated string; also updates job_skills
+    if data.get("skills") is not None:
+        set_job_skills(job, data["skills"])
 
+    db.session.flush()
+    index_job(job.id)
+    invalidate_match_scores(job.id)  # job text changed, stored applicant scores are stale
     db.session.commit()
+    refresh_job(job)
 
     return jsonify({"message": "Job updated successfully"}), 200
 
@@ -1231,8 +1587,10 @@ def update_job(job_id):
 @main.route('/jobs/<int:job_id>', methods=['DELETE'])
 def delete_job(job_id):
     job = Job.query.get_or_404(job_id)
+    remove_job(job.id)
     db.session.delete(job)
     db.session.commit()
+    job_index.remove(job_id)
     return jsonify({"message": "Job deleted"}), 200
 
 
@@ -1247,6 +1605,7 @@ def update_job_status(job_id):
     job = Job.query.get_or_404(job_id)
     job.status = new_status
     db.session.commit()
+    refresh_job(job)
 
     return jsonify({"message": f"Job status updated to {new_status}"}), 200
 
@@ -1254,20 +1613,12 @@ def update_job_status(job_id):
 
 @main.route("/notifications/<int:user_id>/mark-all-read", methods=["PATCH"])
 def mark_all_notifications_as_read(user_id):
-    print(f"PATCH route hit for user_id={user_id}")
-    from .models import Notification
-    from app import db
+    marked = mark_all_read(user_id)
 
-    notifications = Notification.query.filter_by(receiver_id=user_id, read=False).all()
-
-    if not notifications:
+    if not marked:
         return jsonify({"message": "No unread notifications"}), 200
 
-    for notif in notifications:
-        notif.read = True
-        print(f"Marked notification {notif.id} as read")
-    db.session.commit()
-    return jsonify({"message": "Marked all as read"}), 200
+    return jsonify({"message": "Marked all as read", "marked": marked}), 200
 
 
 
@@ -1293,16 +1644,12 @@ def get_all_users():
 
 
 @admin_bp.route('/api/admin/jobs', methods=['GET'])
-@jwt_required()
+@admin_required
 def get_all_jobs():
-    identity = get_jwt_identity()
-    user = User.query.get(identity)
-
-    if user.role != "admin":
-        return jsonify({"msg": "Admins only"}), 403
+    from app.serializers import serialize_jobs
 
     jobs = Job.query.options(joinedload(Job.employer)).all()
-    return jsonify([job.to_dict() for job in jobs]), 200
+    return jsonify(serialize_jobs(jobs)), 200
 
 
 
@@ -1332,28 +1679,16 @@ def create_report():
 
 
 @admin_bp.route("/api/admin/reports", methods=["GET"])
-@jwt_required()
+@admin_required
 def get_reports():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'admin':
-        return jsonify({"msg": "Admins only"}), 403
-
     reports = Report.query.order_by(Report.created_at.desc()).all()
     return jsonify([r.to_dict() for r in reports])
 
 
 
 @admin_bp.route("/api/admin/reports/<int:report_id>/resolve", methods=["POST"])
-@jwt_required()
+@admin_required
 def resolve_report(report_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or user.role != 'admin':
-        return jsonify({"msg": "Admins only"}), 403
-
     report = Report.query.get_or_404(report_id)
     report.status = "resolved"
     db.session.commit()
@@ -1362,14 +1697,8 @@ def resolve_report(report_id):
 
 
 @admin_bp.route("/api/admin/stats", methods=["GET"])
-@jwt_required()
+@admin_required
 def get_admin_panel_stats():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-
-    if not user or user.role != "admin":
-        return jsonify({"msg": "Admins only"}), 403
-
     total_users = User.query.count()
     active_jobs = Job.query.filter_by(status="active").count()
     applications = Application.query.count()
@@ -1567,6 +1896,7 @@ from werkzeug.security import generate_password_hash
 #     }), 200
 
 @main.route("/verify-email", methods=["POST"])
+@rate_limited("verify_code")
 def verify_email():
     from datetime import datetime, timezone
     data = request.get_json()
@@ -1624,7 +1954,7 @@ def verify_email():
     db.session.commit()
 
     # ✅ Issue access token
-    access_token = create_access_token(identity=str(new_user.id))
+    access_token = issue_access_token(new_user)
 
     return jsonify({
         "message": "Email successfully verified.",
@@ -1688,6 +2018,7 @@ def verify_email():
 
 
 @main.route("/register", methods=["POST"])
+@rate_limited("verify_code")
 def register():
     from datetime import datetime, timezone
     data = request.get_json()
@@ -1744,7 +2075,7 @@ def register():
     db.session.commit()
 
     # Generate JWT token
-    token = create_access_token(identity=str(user.id))
+    token = issue_access_token(user)
 
     return jsonify({
         "message": "Registration complete.",
@@ -1763,6 +2094,7 @@ def register():
 
 
 @main.route('/request-password-reset', methods=['POST'])
+@rate_limited("send_code")
 def request_password_reset():
     data = request.get_json()
     email = data.get('email')
@@ -1777,20 +2109,17 @@ def request_password_reset():
     # Generate a 6-digit reset code
     code = str(random.randint(100000, 999999))
     user.reset_code = code
+
+    # Queue the code with the reset so neither is saved without the other
+    queue_reset_email(user.email, code)
     db.session.commit()
+    notify_outbox()
 
-    # Send code via email
-    try:
-        send_reset_email(user.email, code)
-        return jsonify({"message": "Password reset code sent successfully."}), 200
-    except Exception as e:
-        return jsonify({
-            "message": "Failed to send reset code.",
-            "error": str(e)
-        }), 500
+    return jsonify({"message": "Password reset code sent successfully."}), 200
 
 
 @main.route('/verify-reset-code', methods=['POST'])
+@rate_limited("verify_code")
 def verify_reset_code():
     data = request.get_json()
     email = data.get('email')
@@ -1808,6 +2137,7 @@ def verify_reset_code():
 
 
 @main.route('/reset-password', methods=['POST'])
+@rate_limited("verify_code")
 def reset_password():
     data = request.get_json()
     email = data.get('email')
@@ -1822,9 +2152,10 @@ def reset_password():
     if not user or user.reset_code != code:
         return jsonify({"message": "Invalid email or reset code."}), 400
 
-    # Update the password
+    # Update the password and sign out every existing session
     user.set_password(new_password)
     user.reset_code = None  # Invalidate the used code
+    revoke_tokens(user)
     db.session.commit()
 
     return jsonify({"message": "Password reset successfully."}), 200
@@ -1844,8 +2175,10 @@ def change_password():
         return jsonify({"message": "Current password is incorrect"}), 400
 
     user.set_password(new_password)
+    revoke_tokens(user)
     db.session.commit()
-    return jsonify({"message": "Password updated successfully"}), 200
+    # Other sessions are signed out; this one continues with a fresh token
+    return jsonify({"message": "Password updated successfully", "access_token": issue_access_token(user)}), 200
 
 
 @main.route("/cleanup-expired-registrations", methods=["POST"])
@@ -1872,8 +2205,17 @@ def delete_account():
     if not user:
         return jsonify({"message": "User not found"}), 404
 
+    # Drop the seeker's applications/saves and keep the job counters in step
+    if user.role == "job_seeker":
+        release_seeker_activity(user.id)
+        Resume.query.filter_by(owner_id=user.id).delete(synchronize_session=False)
+
+    # Drop the user's upload references; blobs nobody else uses are deleted below
+    released = release_owner(user.id)
+
     db.session.delete(user)
     db.session.commit()
+    collect_garbage(released)
 
     return jsonify({"message": "Account deleted successfully"}), 200
 
@@ -1886,15 +2228,15 @@ def upload_resume_pdf():
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
 
-    filename = secure_filename(file.filename)
-    upload_dir = os.path.join(os.getcwd(), 'uploads')
-    os.makedirs(upload_dir, exist_ok=True)
+    # Claimed when the URL is saved on a resume or application
+    blob = save_upload(file)
+    db.session.commit()
 
-    filepath = os.path.join(upload_dir, filename)
-    file.save(filepath)
-    base_url = request.host_url.rstrip("/")
+    url = get_storage().url(blob.key)
+    if url.startswith("/"):
+        url = request.host_url.rstrip("/") + url
     # Optional: You can return the URL or just confirm
     return jsonify({
         "message": "File uploaded successfully",
-        "url": f"{base_url}/uploads/{filename}"
+        "url": url
     }), 200
@@ -0,0 +1,79 @@
+from sqlalchemy import inspect, text
+
+
+def add_missing_columns(db):
+    """
+    db.create_all() only creates missing tables, so columns added to an
+    existing model never reach a database created by an older version.
+    This adds them with ALTER TABLE. Only nullable columns or columns with a
+    server_default can be added this way, which is how new columns are declared.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    dialect = db.engine.dialect
+    added = []
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=dialect)}'
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def create_missing_indexes(db):
+    """
+    db.create_all() only builds indexes together with a new table, so an
+    index declared later on an existing model never reaches the database.
+    Run after add_missing_columns, since new indexes may cover new columns.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    created.append(index.name)
+
+    return created
+
+
+def relax_not_null(db):
+    """
+    Drop NOT NULL on columns the models now declare nullable (Postgres only;
+    SQLite can't alter constraints in place, recreate the dev database there).
+    """
+    if db.engine.dialect.name != "postgresql":
+        return []
+
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    relaxed = []
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            db_columns = {c["name"]: c for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                db_column = db_columns.get(column.name)
+                if db_column and column.nullable and not column.primary_key and not db_column["nullable"]:
+                    conn.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {column.name} DROP NOT NULL"))
+                    relaxed.append(f"{table.name}.{column.name}")
+
+    return relaxed
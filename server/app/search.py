@@ -0,0 +1,152 @@
+import re
+from sqlalchemy import inspect, text
+from . import db
+
+
+# Postgres: one tsvector per job in a side table with a GIN index.
+# SQLite:   an FTS5 virtual table whose rowid is the job id.
+#
+# Fields are weighted so a hit in the title/skills outranks one buried in
+# the description.
+
+_PG_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS job_search_index (
+        job_id INTEGER PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_job_search_index_document ON job_search_index USING GIN (document)",
+]
+
+_PG_UPSERT = """
+    INSERT INTO job_search_index (job_id, document)
+    SELECT j.id,
+           setweight(to_tsvector('english', coalesce(j.title, '')), 'A') ||
+           setweight(to_tsvector('english', replace(coalesce(j.skills, ''), ',', ' ')), 'A') ||
+           setweight(to_tsvector('english', coalesce(e.company_name, '')), 'B') ||
+           setweight(to_tsvector('english', coalesce(j.requirements, '')), 'C') ||
+           setweight(to_tsvector('english', coalesce(j.description, '')), 'D')
+    FROM jobs j
+    LEFT JOIN employers e ON e.id = j.employer_id
+    WHERE {where}
+    ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document
+"""
+
+_PG_SEARCH = """
+    SELECT job_id, ts_rank_cd(document, query) AS score
+    FROM job_search_index, websearch_to_tsquery('english', :q) AS query
+    WHERE document @@ query
+    ORDER BY score DESC, job_id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS job_search USING fts5(
+        title, description, requirements, skills, company_name,
+        tokenize = 'porter unicode61'
+    )
+    """,
+]
+
+_SQLITE_UPSERT = """
+    INSERT INTO job_search (rowid, title, description, requirements, skills, company_name)
+    SELECT j.id, j.title, j.description, j.requirements,
+           replace(coalesce(j.skills, ''), ',', ' '), coalesce(e.company_name, '')
+    FROM jobs j
+    LEFT JOIN employers e ON e.id = j.employer_id
+    WHERE {where}
+"""
+
+# bm25() is "lower is better"; weights follow the column order above
+_SQLITE_SEARCH = """
+    SELECT rowid AS job_id, -bm25(job_search, 10.0, 1.0, 2.0, 8.0, 4.0) AS score
+    FROM job_search
+    WHERE job_search MATCH :q
+    ORDER BY score DESC, rowid DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+
+def _is_postgres():
+    return db.engine.dialect.name == "postgresql"
+
+
+def ensure_search_index():
+    """
+    Create the search index table if it doesn't exist yet (called from
+    create_app). A newly created table is filled from the jobs table in the
+    same transaction, so an existing database doesn't start with an empty
+    index. Returns True if the table was created.
+    """
+    if _is_postgres():
+        table, statements, upsert = "job_search_index", _PG_DDL, _PG_UPSERT
+    else:
+        table, statements, upsert = "job_search", _SQLITE_DDL, _SQLITE_UPSERT
+    with db.engine.begin() as conn:
+        if inspect(conn).has_table(table):
+            return False
+        for ddl in statements:
+            conn.execute(text(ddl))
+        conn.execute(text(upsert.format(where="1 = 1")))
+    return True
+
+
+def _reindex(where, params):
+    if _is_postgres():
+        db.session.execute(text(_PG_UPSERT.format(where=where)), params)
+    else:
+        db.session.execute(
+            text(f"DELETE FROM job_search WHERE rowid IN (SELECT j.id FROM jobs j WHERE {where})"),
+            params,
+        )
+        db.session.execute(text(_SQLITE_UPSERT.format(where=where)), params)
+
+
+def index_job(job_id):
+    """(Re)index one job inside the current transaction. The job row must be flushed."""
+    _reindex("j.id = :job_id", {"job_id": job_id})
+
+
+def index_employer_jobs(employer_id):
+    """Reindex every job of an employer, e.g. after the company name changes."""
+    _reindex("j.employer_id = :employer_id", {"employer_id": employer_id})
+
+
+def remove_job(job_id):
+    if _is_postgres():
+        db.session.execute(text("DELETE FROM job_search_index WHERE job_id = :job_id"), {"job_id": job_id})
+    else:
+        db.session.execute(text("DELETE FROM job_search WHERE rowid = :job_id"), {"job_id": job_id})
+
+
+def rebuild_search_index():
+    """Drop and rebuild the whole index from the jobs table. Returns the number of jobs indexed."""
+    if _is_postgres():
+        db.session.execute(text("DELETE FROM job_search_index"))
+    else:
+        db.session.execute(text("DELETE FROM job_search"))
+    _reindex("1 = 1", {})
+    db.session.commit()
+    from .models import Job
+    return Job.query.count()
+
+
+def _fts5_query(q):
+    # Quote every term so user input can't inject FTS5 operators; terms are ANDed
+    terms = re.findall(r"\w+", q, flags=re.UNICODE)
+    return " ".join('"%s"' % term for term in terms)
+
+
+def search_job_ids(q, limit, offset=0):
+    """Return [(job_id, score), ...] best match first."""
+    if _is_postgres():
+        sql, query = _PG_SEARCH, q
+    else:
+        sql, query = _SQLITE_SEARCH, _fts5_query(q)
+        if not query:
+            return []
+
+    rows = db.session.execute(text(sql), {"q": query, "limit": limit, "offset": offset}).all()
+    return [(row.job_id, float(row.score)) for row in rows]
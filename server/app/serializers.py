@@ -0,0 +1,9 @@
+def serialize_jobs(jobs):
+    """
+    Bulk version of Job.to_dict.
+
+    Expects the jobs to be loaded with joinedload(Job.employer) so the
+    employer comes from the same query. Applicant and saved counts are
+    denormalized columns on Job, so no per-job COUNT is needed.
+    """
+    return [job.to_dict() for job in jobs]
@@ -0,0 +1,115 @@
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from . import db
+
+
+def canonical_skill(name):
+    """'  Machine   Learning ' -> 'machine learning'"""
+    return " ".join(str(name).split()).casefold()
+
+
+def parse_skill_list(value):
+    """
+    Accept a list of skills or a comma-separated string and return the
+    display names, stripped and deduplicated case-insensitively (first spelling wins).
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+
+    seen = {}
+    for raw in value:
+        display = " ".join(str(raw).split())
+        key = display.casefold()
+        if key and key not in seen:
+            seen[key] = display
+    return list(seen.values())
+
+
+def get_or_create_skills(names):
+    """Return Skill rows for the given display names, creating missing ones."""
+    from .models import Skill
+
+    display_by_key = {canonical_skill(n): n for n in parse_skill_list(names)}
+    if not display_by_key:
+        return []
+
+    existing = {s.name: s for s in Skill.query.filter(Skill.name.in_(display_by_key)).all()}
+    for key, display in display_by_key.items():
+        if key in existing:
+            continue
+        try:
+            # Savepoint so a concurrent insert of the same skill doesn't poison the outer transaction
+            with db.session.begin_nested():
+                skill = Skill(name=key, display_name=display)
+                db.session.add(skill)
+            existing[key] = skill
+        except IntegrityError:
+            existing[key] = Skill.query.filter_by(name=key).one()
+
+    return [existing[key] for key in display_by_key]
+
+
+def set_job_skills(job, names):
+    """Replace a job's skills and keep the comma-joined Job.skills display copy in step."""
+    skills = get_or_create_skills(names)
+    job.skill_set = skills
+    job.skills = ",".join(s.display_name for s in skills)
+
+
+def set_seeker_skills(job_seeker, names):
+    skills = get_or_create_skills(names)
+    job_seeker.skill_set = skills
+    job_seeker.skills = [s.display_name for s in skills]
+
+
+def job_ids_with_skills(names, match="any"):
+    """
+    Subquery of job ids requiring any/all of the given skills. Uses the
+    (skill_id, job_id) index on job_skills, so no LIKE scan over Job.skills.
+    """
+    from .models import Skill, job_skills
+
+    keys = list({canonical_skill(n) for n in parse_skill_list(names)})
+    query = (
+        select(job_skills.c.job_id)
+        .join(Skill, Skill.id == job_skills.c.skill_id)
+        .where(Skill.name.in_(keys))
+    )
+    if match == "all":
+        query = (
+            query.group_by(job_skills.c.job_id)
+            .having(func.count(job_skills.c.skill_id) == len(keys))
+        )
+    return query
+
+
+def backfill_skills():
+    """Populate job_skills/seeker_skills from the legacy Job.skills and JobSeeker.skills columns."""
+    from .models import Job, JobSeeker
+
+    jobs = 0
+    for job in Job.query.filter(Job.skills.isnot(None)).all():
+        set_job_skills(job, job.skills)
+        jobs += 1
+
+    seekers = 0
+    for seeker in JobSeeker.query.filter(JobSeeker.skills.isnot(None)).all():
+        set_seeker_skills(seeker, seeker.skills)
+        seekers += 1
+
+    db.session.commit()
+    return jobs, seekers
+
+
+def backfill_new_skill_tables(existing_tables):
+    """
+    Fill job_skills/seeker_skills when create_all() has just created them on
+    an existing database (`existing_tables` is what was there before), so
+    skill filters and digests match legacy jobs and seekers straight away.
+    Returns backfill_skills()' counts, or None if the tables already existed.
+    """
+    if {"job_skills", "seeker_skills"} <= set(existing_tables) or "jobs" not in existing_tables:
+        return None
+    return backfill_skills()
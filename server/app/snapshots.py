@@ -0,0 +1,63 @@
+import hashlib
+import json
+
+
+def canonical_json(data):
+    """Serialize a resume snapshot the same way every time (sorted keys, no whitespace)."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def snapshot_digest(data):
+    """SHA-256 hex digest of the canonical JSON; equal resumes give equal digests."""
+    return hashlib.sha256(canonical_json(data).encode("utf-8")).hexdigest()
+
+
+def store_snapshot(data):
+    """
+    Put a resume snapshot in the content-addressed store (once per distinct
+    resume) and return its digest. Runs inside the caller's transaction.
+    """
+    from sqlalchemy.exc import IntegrityError
+    from . import db
+    from .models import ResumeSnapshot
+
+    digest = snapshot_digest(data)
+    if db.session.get(ResumeSnapshot, digest) is None:
+        try:
+            # Savepoint: another request may store the same resume concurrently
+            with db.session.begin_nested():
+                db.session.add(ResumeSnapshot(digest=digest, data=json.loads(canonical_json(data))))
+        except IntegrityError:
+            pass
+    return digest
+
+
+def backfill_snapshots(batch_size=500):
+    """
+    Move inline Application.resume_snapshot blobs into resume_snapshots,
+    point each application at its digest and clear the inline copy.
+    Commits per batch so it can be stopped and resumed. Returns (migrated, distinct).
+    """
+    from . import db
+    from .models import Application
+
+    migrated, digests = 0, set()
+    while True:
+        batch = (
+            Application.query
+            .filter(Application.snapshot_digest.is_(None), Application.resume_snapshot.isnot(None))
+            .order_by(Application.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        for application in batch:
+            digest = store_snapshot(application.resume_snapshot)
+            application.snapshot_digest = digest
+            application.resume_snapshot = None
+            digests.add(digest)
+        db.session.commit()
+        migrated += len(batch)
+
+    return migrated, len(digests)
@@ -0,0 +1,196 @@
+"""
+Serving uploaded files. Content-addressed paths ("ab/cd/<sha256>.pdf" and
+their thumbnails) never change, so they get the content hash as a strong
+ETag and a year of immutable caching; legacy flat uploads revalidate on
+every use. Conditional GETs answer 304 and Range requests 206 (PDF viewers
+fetch big resumes piecemeal). With UPLOAD_SENDFILE set, a fronting nginx
+(X-Accel-Redirect) or Apache/lighttpd (X-Sendfile) streams the bytes and
+the Python worker only sends headers.
+
+SpaAssets does the same for the built React client behind serve_spa.
+"""
+import mimetypes
+import os
+import re
+
+from flask import abort, current_app, redirect, request
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+
+# Blob keys and their thumbnail variants (see app/storage.py and app/images.py)
+HASHED_PATH_RE = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64}(?:_\d+)?)\.[a-z0-9]+$")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+SENDFILE_MODES = ("", "x-accel", "x-sendfile")
+
+
+def send_upload(filename):
+    """Response for GET /uploads/<filename>."""
+    from .storage import get_storage, key_from_url, LocalStorage
+
+    path = safe_join(current_app.config["UPLOAD_FOLDER"], filename)
+    if path is None or not os.path.isfile(path):
+        # With S3 storage the bytes aren't here; old links still resolve
+        key = key_from_url(filename)
+        storage = get_storage()
+        if key == filename and not isinstance(storage, LocalStorage):
+            return redirect(storage.url(key))
+        abort(404)
+
+    hashed = HASHED_PATH_RE.match(filename)
+    mode = current_app.config.get("UPLOAD_SENDFILE", "")
+    if mode not in SENDFILE_MODES:
+        raise ValueError(f"Unknown UPLOAD_SENDFILE {mode!r}, expected one of {SENDFILE_MODES}")
+
+    environ = request.environ
+    if mode:
+        # The proxy answers Range itself from the full file
+        environ = {k: v for k, v in environ.items() if k not in ("HTTP_RANGE", "HTTP_IF_RANGE")}
+
+    response = send_file(
+        path,
+        environ,
+        mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream",
+        use_x_sendfile=bool(mode),
+        response_class=current_app.response_class,
+        conditional=True,
+        etag=hashed.group(1) if hashed else True,
+        max_age=IMMUTABLE_MAX_AGE if hashed else 0,
+    )
+    if hashed:
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+
+    if mode == "x-accel" and "X-Sendfile" in response.headers:
+        del response.headers["X-Sendfile"]
+        prefix = current_app.config.get("UPLOAD_ACCEL_PREFIX", "/protected-uploads/").rstrip("/")
+        response.headers["X-Accel-Redirect"] = f"{prefix}/{filename}"
+    return response
+
+
+# Vite writes built assets as assets/<name>-<8 char hash>.<ext> (e.g. assets/index-B3x9Kq1z.js);
+# files copied from public/ keep their names, so "hero-background.jpg" must not match
+HASHED_ASSET_RE = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+# Preferred first; siblings are written by `flask compress-spa`
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE = (".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".webmanifest", ".ico")
+
+
+class SpaAssets:
+    """
+    The client build (client/dist), scanned once at startup so requests
+    never touch the filesystem to route: relative path -> precompressed
+    siblings found. index.html is kept in memory (plain and gzipped) with
+    an ETag, since every client-side route is answered with it.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.files = {}
+        for dirpath, _, names in os.walk(root):
+            present = set(names)
+            for name in names:
+                if name.endswith((".br", ".gz")) and name[:-3] in present:
+                    continue
+                rel = os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/")
+                self.files[rel] = {
+                    encoding: os.path.join(dirpath, name + suffix)
+                    for encoding, suffix in ENCODINGS if name + suffix in present
+                }
+
+        import gzip
+        import hashlib
+
+        with open(os.path.join(root, "index.html"), "rb") as f:
+            self.index = f.read()
+        self.index_gzip = gzip.compress(self.index, mtime=0)
+        self.index_etag = hashlib.sha256(self.index).hexdigest()[:32]
+
+    @classmethod
+    def scan(cls, root):
+        """SpaAssets for `root`, or None when the client hasn't been built (API-only development)."""
+        if not os.path.isfile(os.path.join(root, "index.html")):
+            return None
+        return cls(root)
+
+    def send(self, path):
+        if path in self.files and path != "index.html":
+            return self._send_file(path)
+        return self._send_index()
+
+    def _send_index(self):
+        if request.accept_encodings["gzip"]:
+            response = current_app.response_class(self.index_gzip, mimetype="text/html")
+            response.headers["Content-Encoding"] = "gzip"
+            response.set_etag(f"{self.index_etag}-gz")
+        else:
+            response = current_app.response_class(self.index, mimetype="text/html")
+            response.set_etag(self.index_etag)
+        response.vary.add("Accept-Encoding")
+        response.cache_control.no_cache = True  # new deploys must be picked up straight away
+        return response.make_conditional(request)
+
+    def _send_file(self, path):
+        original = os.path.join(self.root, *path.split("/"))
+        served, encoding = original, None
+        for candidate, variant in self.files[path].items():
+            if request.accept_encodings[candidate]:
+                served, encoding = variant, candidate
+                break
+
+        hashed = HASHED_ASSET_RE.match(path)
+        response = send_file(
+            served,
+            request.environ,
+            mimetype=mimetypes.guess_type(original)[0] or "application/octet-stream",
+            response_class=current_app.response_class,
+            conditional=True,
+            max_age=IMMUTABLE_MAX_AGE if hashed else 0,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if self.files[path]:
+            response.vary.add("Accept-Encoding")
+        if hashed:
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+
+def precompress(root, min_size=1024):
+    """
+    Write .gz (and .br, when the optional brotli package is installed)
+    siblings for the text assets under `root`. Returns the number of files
+    written. Run after `npm run build`; the server picks them up on restart.
+    """
+    import gzip
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    written = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            outputs = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                outputs.append((".br", lambda d: brotli.compress(d, quality=11)))
+            for suffix, compress in outputs:
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, "wb") as f:
+                    f.write(compressed)
+                written += 1
+    return written
@@ -0,0 +1,316 @@
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from werkzeug.utils import secure_filename
+
+from . import db
+
+
+CHUNK_SIZE = 1 << 20
+GC_GRACE = timedelta(hours=24)  # unclaimed uploads (e.g. mid-registration) survive this long
+
+_KEY_RE = re.compile(r"([0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(?:\.[a-z0-9]+)?)$")
+
+
+class StorageBackend:
+    """
+    Where blob bytes live. Keys are content-addressed ("ab/cd/<sha256>.pdf"),
+    so put() of an existing key is always a no-op overwrite with identical bytes.
+    """
+
+    def put(self, key, path, content_type=None):
+        """Move the finished temp file at `path` into place under `key`."""
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def local_path(self, key):
+        """A filesystem path with the blob's bytes, for code that needs a real file (parsers, thumbnails)."""
+        raise NotImplementedError
+
+    def url(self, key):
+        raise NotImplementedError
+
+    def temp_dir(self):
+        return tempfile.gettempdir()
+
+
+class LocalStorage(StorageBackend):
+    """Blobs under the uploads folder, served by the /uploads/<path> route."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def temp_dir(self):
+        # Same filesystem as the final location so os.replace() is an atomic rename
+        path = os.path.join(self.root, ".tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def put(self, key, path, content_type=None):
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key):
+        return self._path(key)
+
+    def url(self, key):
+        return f"/uploads/{key}"
+
+
+class S3Storage(StorageBackend):
+    """
+    S3 or any S3-compatible store (MinIO, R2, ...). boto3 is only imported
+    when this backend is configured. Blobs are downloaded to `cache_dir`
+    when code needs them on local disk.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, public_url=None, cache_dir=None):
+        import boto3
+
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.public_url = (public_url or f"{endpoint_url or 'https://s3.amazonaws.com'}/{bucket}").rstrip("/")
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "jobhive-blobs")
+
+    def _object_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key, path, content_type=None):
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.upload_file(path, self.bucket, self._object_key(key), ExtraArgs=extra)
+        os.remove(path)
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        try:
+            os.remove(os.path.join(self.cache_dir, *key.split("/")))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key):
+        path = os.path.join(self.cache_dir, *key.split("/"))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.part"
+            self.client.download_file(self.bucket, self._object_key(key), tmp)
+            os.replace(tmp, path)
+        return path
+
+    def url(self, key):
+        return f"{self.public_url}/{self._object_key(key)}"
+
+
+def get_storage():
+    """The configured backend (UPLOAD_STORAGE = "local" or "s3"), built once per app."""
+    storage = current_app.extensions.get("upload_storage")
+    if storage is None:
+        config = current_app.config
+        if config.get("UPLOAD_STORAGE", "local") == "s3":
+            storage = S3Storage(
+                bucket=config["S3_BUCKET"],
+                prefix=config.get("S3_PREFIX", ""),
+                endpoint_url=config.get("S3_ENDPOINT_URL"),
+                public_url=config.get("S3_PUBLIC_URL"),
+            )
+        else:
+            storage = LocalStorage(config["UPLOAD_FOLDER"])
+        current_app.extensions["upload_storage"] = storage
+    return storage
+
+
+def blob_key(sha256, filename):
+    ext = os.path.splitext(secure_filename(filename or ""))[1].lower()
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def key_from_url(url):
+    """Blob key of an upload URL we handed out, or None for anything else (legacy flat uploads, external links)."""
+    match = _KEY_RE.search(url or "")
+    return match.group(1) if match else None
+
+
+def save_upload(file, owner_id=None, purpose=None):
+    """
+    Store an uploaded werkzeug FileStorage by content. The body is streamed
+    to a temp file while it is hashed, then renamed into its sharded
+    content-addressed place; identical files are kept once. Adds a reference
+    for `owner_id` when given. The caller commits. Returns the StoredBlob.
+    """
+    from .models import StoredBlob
+
+    storage = get_storage()
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=storage.temp_dir(), suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+        key = blob_key(digest.hexdigest(), file.filename)
+        blob = db.session.get(StoredBlob, key, with_for_update=True)
+        if blob is None:
+            try:
+                with db.session.begin_nested():
+                    blob = StoredBlob(key=key, sha256=digest.hexdigest(), size=size, content_type=file.content_type)
+                    db.session.add(blob)
+            except IntegrityError:
+                blob = db.session.get(StoredBlob, key, with_for_update=True)
+
+        if storage.exists(key):
+            os.remove(tmp_path)
+        else:
+            storage.put(key, tmp_path, file.content_type)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if owner_id is not None:
+        add_ref(key, owner_id, purpose)
+    return blob
+
+
+def save_file(path, owner_id=None, purpose=None):
+    """save_upload() for a file already on disk (migrating legacy uploads). The file is copied, not moved."""
+    import mimetypes
+    from werkzeug.datastructures import FileStorage
+
+    with open(path, "rb") as f:
+        file = FileStorage(f, filename=os.path.basename(path), content_type=mimetypes.guess_type(path)[0])
+        return save_upload(file, owner_id, purpose)
+
+
+def add_ref(key, owner_id, purpose, replace=False):
+    """
+    Record that `owner_id` uses blob `key` for `purpose`. With replace=True the
+    owner's previous blob for that purpose (an old logo, say) is released.
+    No-op if the reference already exists. The caller commits.
+    """
+    from .models import StoredBlob, BlobRef
+
+    if replace:
+        for ref in BlobRef.query.filter(
+            BlobRef.owner_id == owner_id, BlobRef.purpose == purpose, BlobRef.blob_key != key
+        ):
+            _drop_ref(ref)
+
+    if BlobRef.query.filter_by(blob_key=key, owner_id=owner_id, purpose=purpose).first():
+        return
+    if db.session.get(StoredBlob, key) is None:
+        return
+    db.session.add(BlobRef(blob_key=key, owner_id=owner_id, purpose=purpose))
+    StoredBlob.query.filter(StoredBlob.key == key).update(
+        {StoredBlob.ref_count: StoredBlob.ref_count + 1}, synchronize_session=False
+    )
+
+
+def reference_url(url, owner_id, purpose, replace=False):
+    """add_ref() for an upload URL coming back from the client; ignores URLs that aren't blobs."""
+    key = key_from_url(url)
+    if key:
+        add_ref(key, owner_id, purpose, replace=replace)
+
+
+def _drop_ref(ref):
+    from .models import StoredBlob
+
+    StoredBlob.query.filter(StoredBlob.key == ref.blob_key).update(
+        {StoredBlob.ref_count: StoredBlob.ref_count - 1}, synchronize_session=False
+    )
+    db.session.delete(ref)
+
+
+def release_owner(owner_id):
+    """Drop every reference held by a user (account deletion). Returns the affected blob keys."""
+    from .models import BlobRef
+
+    keys = []
+    for ref in BlobRef.query.filter_by(owner_id=owner_id).all():
+        keys.append(ref.blob_key)
+        _drop_ref(ref)
+    return keys
+
+
+def collect_garbage(keys=None, grace=GC_GRACE):
+    """
+    Delete blobs nobody references that are older than `grace` (limited to
+    `keys` if given). Each blob row is locked while its bytes are removed, so
+    a concurrent upload of the same content waits and then re-creates it.
+    Returns the number of blobs deleted.
+    """
+    from .models import StoredBlob
+
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - grace
+    query = db.session.query(StoredBlob.key).filter(StoredBlob.ref_count <= 0, StoredBlob.created_at < cutoff)
+    if keys is not None:
+        if not keys:
+            return 0
+        query = query.filter(StoredBlob.key.in_(keys))
+
+    storage = get_storage()
+    deleted = 0
+    for (key,) in query.all():
+        blob = db.session.get(StoredBlob, key, with_for_update=True, populate_existing=True)
+        if blob is None or blob.ref_count > 0:
+            db.session.rollback()
+            continue
+        for formats in (blob.variants or {}).values():
+            for variant in formats.values():
+                storage.delete(variant)  # thumbnails from app/images.py
+        storage.delete(key)
+        db.session.delete(blob)
+        db.session.commit()
+        deleted += 1
+    return deleted
+
+
+def clean_temp_files(max_age=timedelta(hours=1)):
+    """Remove temp files left by uploads that died mid-stream (local backend only)."""
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        return 0
+    removed = 0
+    cutoff = datetime.now().timestamp() - max_age.total_seconds()
+    tmp = storage.temp_dir()
+    for name in os.listdir(tmp):
+        path = os.path.join(tmp, name)
+        if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
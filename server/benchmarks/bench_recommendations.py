@@ -0,0 +1,60 @@
+"""
+Top-k recommendation latency over a synthetic job corpus.
+
+    cd server && python benchmarks/bench_recommendations.py [n_jobs]
+
+Builds a JobVectorIndex in memory (no database) and times top_k() queries.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.recommendations import JobVectorIndex  # noqa: E402
+
+WORDS = (
+    "python java react node sql postgresql docker kubernetes aws azure flask django "
+    "api rest graphql testing agile scrum design figma marketing sales finance excel "
+    "analytics machine learning data pipeline etl spark airflow linux networking security "
+    "support customer writing content seo mobile android ios swift kotlin go rust c++"
+).split()
+
+
+def fake_job(rng):
+    return {
+        "title": " ".join(rng.sample(WORDS, 3)),
+        "skills": rng.sample(WORDS, 5),
+        "requirements": " ".join(rng.choices(WORDS, k=40)),
+        "description": " ".join(rng.choices(WORDS, k=120)),
+    }
+
+
+def main(n_jobs=100_000, n_queries=200, k=10):
+    rng = random.Random(42)
+    index = JobVectorIndex()
+
+    t0 = time.perf_counter()
+    for job_id in range(1, n_jobs + 1):
+        index.upsert(job_id, fake_job(rng))
+    t1 = time.perf_counter()
+    index.top_k(fake_job(rng), k=k)  # first query compiles the matrix
+    t2 = time.perf_counter()
+
+    queries = [fake_job(rng) for _ in range(n_queries)]
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        index.top_k(q, k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    print(f"jobs indexed:      {n_jobs:,} in {t1 - t0:.1f}s")
+    print(f"matrix compile:    {(t2 - t1) * 1000:.0f} ms")
+    print(f"top-{k} latency:    p50 {latencies[len(latencies) // 2]:.1f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
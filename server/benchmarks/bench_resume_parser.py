@@ -0,0 +1,63 @@
+"""
+Throughput of the local resume parser over the sample files in uploads/.
+
+    cd server && python benchmarks/bench_resume_parser.py [repeats] [processes]
+
+Parses every PDF in ../uploads (and server/uploads) `repeats` times, first
+serially in this process and then through a ProcessPoolExecutor, and
+reports files per second for each. No database needed.
+"""
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.resume_text import DEFAULT_SKILLS, parse_file  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DIRS = [os.path.join(HERE, "..", "..", "uploads"), os.path.join(HERE, "..", "uploads")]
+
+
+def sample_files():
+    files = []
+    for directory in SAMPLE_DIRS:
+        files.extend(glob.glob(os.path.join(directory, "*.pdf")))
+    return sorted(set(os.path.abspath(f) for f in files))
+
+
+def main(repeats=20, processes=None):
+    files = sample_files()
+    if not files:
+        print("No sample PDFs found in uploads/")
+        return
+    work = files * repeats
+    print(f"{len(files)} sample file(s) x {repeats} = {len(work)} parses")
+
+    start = time.perf_counter()
+    for path in work:
+        parse_file(path, DEFAULT_SKILLS)
+    serial = time.perf_counter() - start
+    print(f"serial:      {len(work) / serial:8.1f} files/s  ({serial * 1000 / len(work):.1f} ms/file)")
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        list(pool.map(parse_file, files, [DEFAULT_SKILLS] * len(files)))  # warm up the workers
+        start = time.perf_counter()
+        list(pool.map(parse_file, work, [DEFAULT_SKILLS] * len(work), chunksize=4))
+        pooled = time.perf_counter() - start
+    workers = processes or os.cpu_count()
+    print(f"pool ({workers:>2}):   {len(work) / pooled:8.1f} files/s  (x{serial / pooled:.1f})")
+
+    for path in files:
+        result = parse_file(path, DEFAULT_SKILLS)
+        print(f"  {os.path.basename(path)}: name={result['name']!r} skills={result['skills'][:5]}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        repeats=int(args[0]) if args else 20,
+        processes=int(args[1]) if len(args) > 1 else None,
+    )
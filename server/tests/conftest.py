@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app.config reads the environment at import time, so configure it before anything imports `app`
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="jobhive-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ["JOB_EXPIRY_SCHEDULER"] = "false"
+os.environ["EMAIL_OUTBOX_WORKERS"] = "0"
+os.environ["RESUME_PARSE_WORKERS"] = "0"
+os.environ["IMAGE_VARIANT_WORKERS"] = "0"
+os.environ["PASSWORD_HASH_PROCESSES"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """A fresh app on an empty SQLite database, with uploads/ under tmp_path."""
+    from app import create_app, db
+
+    if os.path.exists(_DB_PATH):
+        os.remove(_DB_PATH)
+    monkeypatch.chdir(tmp_path)
+    app = create_app()
+    app.config["TESTING"] = True
+    # Per-process caches outlive the database each test starts from
+    from app.auth.tokens import version_cache
+    version_cache.clear()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Call as `with count_queries() as counter:`; counter.count is the number of statements run."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+    from app import db
+
+    @contextmanager
+    def counting():
+        class Counter:
+            count = 0
+
+        def before_cursor_execute(*args):
+            Counter.count += 1
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield Counter
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    return counting
@@ -0,0 +1,25 @@
+import click
+import pytest
+
+from app import background_workers_enabled
+
+
+@pytest.mark.parametrize("command, expected", [(None, True), ("run", True), ("drain-outbox", False)])
+def test_background_workers_start_only_when_serving(app, command, expected):
+    app.config["TESTING"] = False
+
+    if command is None:
+        assert background_workers_enabled(app) is expected
+    else:
+        with click.Context(click.Command(command), info_name=command):
+            assert background_workers_enabled(app) is expected
+
+
+def test_background_workers_setting_overrides_detection(app):
+    app.config["TESTING"] = False
+    with click.Context(click.Command("drain-outbox"), info_name="drain-outbox"):
+        app.config["BACKGROUND_WORKERS"] = "true"
+        assert background_workers_enabled(app) is True
+
+    app.config["BACKGROUND_WORKERS"] = "false"
+    assert background_workers_enabled(app) is False
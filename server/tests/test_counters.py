@@ -0,0 +1,101 @@
+from sqlalchemy import text
+
+from app import db
+from app.counters import backfill_counters, reconcile_job_counters
+from app.models import User, Employer, JobSeeker, Job, Application, SavedJob, Notification
+from app.notifications import mark_all_read, unread_count
+from app.schema import add_missing_columns
+
+
+def _user_with_unread(count):
+    user = User(name="User", email="user@example.com", password_hash="x", role="job_seeker")
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all(Notification(receiver_id=user.id, body=f"n{i}") for i in range(count))
+    db.session.commit()
+    return user.id
+
+
+def test_unread_counter_is_backfilled_when_its_column_is_added(app):
+    user_id = _user_with_unread(3)
+
+    # A database from before the counter existed
+    db.session.execute(text("ALTER TABLE users DROP COLUMN unread_notifications"))
+    db.session.commit()
+    db.engine.dispose()  # restart: pooled SQLite connections cache the old schema
+
+    added = add_missing_columns(db)
+    assert "users.unread_notifications" in added
+    assert backfill_counters(added) == ["users.unread_notifications"]
+    assert unread_count(user_id) == 3
+
+    assert mark_all_read(user_id) == 3
+    assert unread_count(user_id) == 0
+
+
+def test_mark_all_read_never_takes_the_counter_below_zero(app):
+    user_id = _user_with_unread(2)
+    User.query.filter_by(id=user_id).update({User.unread_notifications: 0})
+    db.session.commit()
+
+    assert mark_all_read(user_id) == 2
+    assert unread_count(user_id) == 0
+
+
+def _job_with_activity(seekers=2):
+    owner = User(name="Employer", email="employer@example.com", password_hash="x", role="employer")
+    db.session.add(owner)
+    db.session.flush()
+    db.session.add(Employer(id=owner.id, company_name="Acme"))
+    job = Job(
+        employer_id=owner.id, title="Job", location="Remote", job_type="Full-time",
+        description="d", requirements="r", salary="1",
+    )
+    db.session.add(job)
+    seeker_ids = []
+    for i in range(seekers):
+        seeker = User(name=f"Seeker {i}", email=f"seeker{i}@example.com", password_hash="x", role="job_seeker")
+        db.session.add(seeker)
+        db.session.flush()
+        db.session.add(JobSeeker(id=seeker.id))
+        db.session.add(Application(job_id=job.id, applicant_id=seeker.id))
+        db.session.add(SavedJob(job_id=job.id, seeker_id=seeker.id))
+        seeker_ids.append(seeker.id)
+    db.session.commit()
+    reconcile_job_counters()
+    return job.id, seeker_ids
+
+
+def test_job_counters_are_backfilled_when_their_columns_are_added(app):
+    job_id, _ = _job_with_activity()
+
+    # A database from before the counters existed
+    db.session.execute(text("DROP INDEX ix_jobs_employer_applicant_count"))
+    db.session.execute(text("ALTER TABLE jobs DROP COLUMN applicant_count"))
+    db.session.execute(text("ALTER TABLE jobs DROP COLUMN saved_count"))
+    db.session.commit()
+    db.engine.dispose()
+
+    added = add_missing_columns(db)
+    assert backfill_counters(added) == ["jobs.applicant_count, jobs.saved_count"]
+    job = db.session.get(Job, job_id)
+    assert (job.applicant_count, job.saved_count) == (2, 2)
+
+
+def test_deleting_a_job_seeker_releases_their_applications_and_saves(app):
+    from app.auth.tokens import issue_access_token
+
+    job_id, (seeker_id, other_id) = _job_with_activity()
+    token = issue_access_token(db.session.get(User, seeker_id))
+
+    response = app.test_client().delete("/api/delete-account", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    assert db.session.get(User, seeker_id) is None
+    assert db.session.get(JobSeeker, seeker_id) is None
+    assert Application.query.filter_by(applicant_id=seeker_id).count() == 0
+    assert SavedJob.query.filter_by(seeker_id=seeker_id).count() == 0
+    job = db.session.get(Job, job_id)
+    assert (job.applicant_count, job.saved_count) == (1, 1)
+    assert db.session.get(JobSeeker, other_id) is not None
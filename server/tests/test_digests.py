@@ -0,0 +1,29 @@
+import threading
+
+from app import db
+from app.digests import EMPLOYER_DIGEST, SEEKER_DIGEST, queue_digests
+from app.models import DigestRun
+
+
+def test_concurrent_first_runs_share_one_high_water_mark(app):
+    errors = []
+    barrier = threading.Barrier(2)
+
+    def run():
+        with app.app_context():
+            barrier.wait()
+            try:
+                queue_digests()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(r.kind for r in DigestRun.query.all()) == sorted([EMPLOYER_DIGEST, SEEKER_DIGEST])
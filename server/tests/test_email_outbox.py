@@ -0,0 +1,147 @@
+import socket
+import threading
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def smtp_server():
+    """A local aiosmtpd server. Mail to refused@example.com is rejected with 550, busy@example.com with 451."""
+    from aiosmtpd.controller import Controller
+
+    class Handler:
+        def __init__(self):
+            self.received = []  # (client address, recipients)
+
+        async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+            if address == "refused@example.com":
+                return "550 No such user"
+            if address == "busy@example.com":
+                return "451 Try again later"
+            envelope.rcpt_tos.append(address)
+            return "250 OK"
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received.append((session.peer, list(envelope.rcpt_tos)))
+            return "250 Message accepted"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        yield controller, handler
+    finally:
+        controller.stop()
+
+
+@pytest.fixture
+def connection(smtp_server, monkeypatch):
+    from app.auth.email_utils import SMTPConnection
+
+    controller, _ = smtp_server
+    monkeypatch.setenv("EMAIL_USE_TLS", "false")
+    monkeypatch.setenv("EMAIL_FROM", "noreply@example.com")
+    monkeypatch.delenv("EMAIL_USER", raising=False)
+    return SMTPConnection(host=controller.hostname, port=controller.port)
+
+
+def _queue(*addresses):
+    from app import db
+    from app.auth.email_utils import queue_email
+
+    messages = [queue_email(address, "Subject", "Body") for address in addresses]
+    db.session.commit()
+    return messages
+
+
+def test_drain_outbox_reuses_one_connection(app, smtp_server, connection):
+    from app.email_outbox import drain_outbox
+    from app.models import EmailOutbox
+
+    _, handler = smtp_server
+    _queue("a@example.com", "b@example.com", "c@example.com")
+
+    assert drain_outbox(connection) == 3
+    assert sorted(rcpt for _, (rcpt,) in handler.received) == ["a@example.com", "b@example.com", "c@example.com"]
+    assert len({peer for peer, _ in handler.received}) == 1
+    assert {m.status for m in EmailOutbox.query.all()} == {"sent"}
+
+
+def test_idle_connection_is_probed_and_reconnected(app, smtp_server, connection):
+    _, handler = smtp_server
+    connection.max_idle = 0  # probe with NOOP before every reuse
+
+    connection.send("a@example.com", "Subject", "Body")
+    connection.send("b@example.com", "Subject", "Body")
+    # Simulate the server dropping the idle session: the NOOP fails and we reconnect
+    connection._server.close()
+    connection.send("c@example.com", "Subject", "Body")
+    connection.close()
+
+    peers = [peer for peer, _ in handler.received]
+    assert peers[0] == peers[1] != peers[2]
+
+
+def test_temporary_failure_is_retried_with_backoff(app, smtp_server, connection):
+    from app.email_outbox import BACKOFF_BASE_SECONDS, _now, claim_batch, deliver
+
+    _, handler = smtp_server
+    good, busy = _queue("a@example.com", "busy@example.com")
+
+    before = _now()
+    with connection:
+        assert deliver(claim_batch(), connection) == 1
+    assert good.status == "sent"
+    assert busy.status == "pending"
+    assert busy.attempts == 1
+    assert busy.last_error
+    assert busy.next_attempt_at >= before + timedelta(seconds=BACKOFF_BASE_SECONDS)
+    # Not due yet, so nothing to claim
+    assert claim_batch() == []
+
+    app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"] = 2
+    busy.next_attempt_at = before
+    with connection:
+        assert deliver(claim_batch(), connection) == 0
+    assert busy.status == "failed"
+    assert [rcpt for _, (rcpt,) in handler.received] == ["a@example.com"]
+
+
+def test_permanent_rejection_fails_without_retrying(app, smtp_server, connection):
+    from app.email_outbox import claim_batch, deliver
+
+    (refused,) = _queue("refused@example.com")
+
+    with connection:
+        assert deliver(claim_batch(), connection) == 0
+    assert refused.status == "failed"
+    assert refused.attempts == 1
+    assert "550" in refused.last_error
+
+
+def test_concurrent_workers_claim_disjoint_batches(app):
+    from app import db
+    from app.email_outbox import claim_batch
+
+    _queue(*[f"user{i}@example.com" for i in range(40)])
+    claims = []
+    barrier = threading.Barrier(4)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            claims.extend(m.id for m in claim_batch(limit=40))
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claims) == len(set(claims)) == 40
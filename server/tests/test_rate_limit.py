@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import PendingUser, User
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _wrong_codes(client, path, email, attempts=15):
+    return [client.post(path, json={"email": email, "code": "000000"}).status_code for _ in range(attempts)]
+
+
+def test_register_code_guessing_is_throttled(client):
+    db.session.add(PendingUser(
+        email="new@example.com", name="New", password_hash="x", role="job_seeker",
+        verification_code="123456", expires_at=datetime.now(timezone.utc) + timedelta(minutes=10),
+    ))
+    db.session.commit()
+
+    statuses = _wrong_codes(client, "/api/register", "new@example.com")
+    assert statuses[:10] == [400] * 10
+    assert set(statuses[10:]) == {429}
+
+
+def test_verify_email_code_guessing_is_throttled(client):
+    db.session.add(User(name="User", email="user@example.com", password_hash="x", role="job_seeker", verification_code="123456"))
+    db.session.commit()
+
+    statuses = _wrong_codes(client, "/api/verify-email", "user@example.com")
+    assert 429 not in statuses[:10]
+    assert set(statuses[10:]) == {429}
@@ -0,0 +1,45 @@
+from app import db
+from app.models import User, Employer, Job
+from app.recommendations import JobVectorIndex
+
+
+def _add_job(title):
+    owner = User(name="Employer", email=f"{title.lower().replace(' ', '.')}@example.com", password_hash="x", role="employer")
+    db.session.add(owner)
+    db.session.flush()
+    db.session.add(Employer(id=owner.id, company_name="Acme"))
+    job = Job(
+        employer_id=owner.id, title=title, location="Remote", job_type="Full-time",
+        description="d", requirements="r", salary="1", skills="Python,Flask",
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_sync_without_changes_does_not_recompile(app):
+    _add_job("Python Developer")
+    index = JobVectorIndex()
+    index.sync(force=True)
+    index.idf()
+    assert not index._dirty
+
+    # The newest job is read again at the high-water mark, but its vector hasn't changed
+    index.sync(force=True)
+    assert not index._dirty
+
+    job = _add_job("Data Engineer")
+    index.sync(force=True)
+    assert index._dirty
+    assert job.id in {job_id for job_id, _ in index.top_k({"title": "data engineer"})}
+
+
+def test_warm_loads_the_index_in_the_background(app):
+    job = _add_job("Python Developer")
+    index = JobVectorIndex()
+
+    index.warm(app).join(timeout=10)
+
+    assert len(index) == 1
+    assert not index._dirty
+    assert index.top_k({"skills": ["Python"]})[0][0] == job.id
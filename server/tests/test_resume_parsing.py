@@ -0,0 +1,35 @@
+import threading
+import uuid
+
+from app import db
+from app.models import User, ResumeParseJob
+from app.resume_parsing import claim_parse_jobs
+
+
+def test_concurrent_workers_claim_disjoint_parse_jobs(app):
+    owner = User(name="Seeker", email="seeker@example.com", password_hash="x", role="job_seeker")
+    db.session.add(owner)
+    db.session.flush()
+    db.session.add_all(
+        ResumeParseJob(id=uuid.uuid4().hex, owner_id=owner.id, file_sha256="0" * 64, file_path=f"cv{i}.pdf", status="queued")
+        for i in range(20)
+    )
+    db.session.commit()
+
+    claims = []
+    barrier = threading.Barrier(4)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            claims.extend(job.id for job in claim_parse_jobs(limit=20))
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claims) == len(set(claims)) == 20
+    assert {job.status for job in ResumeParseJob.query.all()} == {"running"}
@@ -0,0 +1,26 @@
+from sqlalchemy import inspect, text
+
+from app import db
+from app.schema import create_missing_indexes
+
+
+def test_indexes_added_to_existing_tables_are_created(app):
+    # A database from before these indexes were declared
+    for name in (
+        "ix_jobs_created_at_id",
+        "ix_notifications_receiver_read_created_at",
+        "ix_notifications_receiver_created_at_id",
+        "ix_applications_job_id_match_score",
+    ):
+        db.session.execute(text(f"DROP INDEX {name}"))
+    db.session.commit()
+    db.engine.dispose()
+
+    assert sorted(create_missing_indexes(db)) == [
+        "ix_applications_job_id_match_score",
+        "ix_jobs_created_at_id",
+        "ix_notifications_receiver_created_at_id",
+        "ix_notifications_receiver_read_created_at",
+    ]
+    assert "ix_jobs_created_at_id" in {i["name"] for i in inspect(db.engine).get_indexes("jobs")}
+    assert create_missing_indexes(db) == []
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+from app import db
+from app.models import User, Employer, Job
+from app.search import ensure_search_index, search_job_ids
+
+
+def test_search_index_is_filled_when_created_on_an_existing_database(app):
+    owner = User(name="Employer", email="employer@example.com", password_hash="x", role="employer")
+    db.session.add(owner)
+    db.session.flush()
+    db.session.add(Employer(id=owner.id, company_name="Acme"))
+    job = Job(
+        employer_id=owner.id, title="Python Developer", location="Remote", job_type="Full-time",
+        description="d", requirements="r", salary="1",
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    # A database from before search existed: the jobs are there, the index table isn't
+    db.session.execute(text("DROP TABLE job_search"))
+    db.session.commit()
+
+    assert ensure_search_index() is True
+    assert [job_id for job_id, _ in search_job_ids("python", limit=10)] == [job.id]
+    assert [job_id for job_id, _ in search_job_ids("acme", limit=10)] == [job.id]
+
+    # Already there: left as it is
+    assert ensure_search_index() is False
@@ -0,0 +1,54 @@
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models import User, Employer, JobSeeker, Job, Application
+from app.serializers import serialize_jobs
+
+
+def _make_seeker():
+    seeker = User(name="Seeker", email="seeker@example.com", password_hash="x", role="job_seeker")
+    db.session.add(seeker)
+    db.session.flush()
+    db.session.add(JobSeeker(id=seeker.id))
+    db.session.commit()
+    return seeker.id
+
+
+def _add_jobs(seeker_id, start, count):
+    for i in range(start, start + count):
+        # One employer per job, so a lazy employer load would cost a query per job
+        owner = User(name=f"Employer {i}", email=f"employer{i}@example.com", password_hash="x", role="employer")
+        db.session.add(owner)
+        db.session.flush()
+        db.session.add(Employer(id=owner.id, company_name=f"Company {i}", logo_url=f"/uploads/logo{i}.png"))
+        job = Job(
+            employer_id=owner.id, title=f"Job {i}", location="Remote", job_type="Full-time",
+            description="d", requirements="r", salary="1", applicant_count=1, saved_count=0,
+        )
+        db.session.add(job)
+        db.session.flush()
+        db.session.add(Application(job_id=job.id, applicant_id=seeker_id))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def _serialize_all(count_queries):
+    with count_queries() as counter:
+        jobs = Job.query.options(joinedload(Job.employer)).all()
+        data = serialize_jobs(jobs)
+    return data, counter.count
+
+
+def test_serialize_jobs_query_count_is_constant(app, count_queries):
+    seeker_id = _make_seeker()
+
+    _add_jobs(seeker_id, 0, 1)
+    one, queries_for_one = _serialize_all(count_queries)
+
+    _add_jobs(seeker_id, 1, 9)
+    many, queries_for_many = _serialize_all(count_queries)
+
+    assert len(one) == 1 and len(many) == 10
+    assert queries_for_many == queries_for_one
+    assert {job["company_name"] for job in many} == {f"Company {i}" for i in range(10)}
+    assert all(job["applicant_count"] == 1 for job in many)
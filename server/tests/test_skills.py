@@ -0,0 +1,34 @@
+from sqlalchemy import inspect, text
+
+from app import db
+from app.models import User, Employer, JobSeeker, Job
+from app.skills import backfill_new_skill_tables, job_ids_with_skills
+
+
+def test_skill_tables_are_filled_when_created_on_an_existing_database(app):
+    owner = User(name="Employer", email="employer@example.com", password_hash="x", role="employer")
+    seeker = User(name="Seeker", email="seeker@example.com", password_hash="x", role="job_seeker")
+    db.session.add_all([owner, seeker])
+    db.session.flush()
+    db.session.add(Employer(id=owner.id, company_name="Acme"))
+    db.session.add(JobSeeker(id=seeker.id, skills=["Python"]))
+    # Legacy rows: only the denormalized Job.skills / JobSeeker.skills columns are set
+    job = Job(
+        employer_id=owner.id, title="Job", location="Remote", job_type="Full-time",
+        description="d", requirements="r", salary="1", skills="Python, Flask",
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    db.session.execute(text("DROP TABLE job_skills"))
+    db.session.execute(text("DROP TABLE seeker_skills"))
+    db.session.commit()
+    db.engine.dispose()
+
+    existing_tables = set(inspect(db.engine).get_table_names())
+    db.create_all()
+    assert backfill_new_skill_tables(existing_tables) == (1, 1)
+    assert db.session.execute(job_ids_with_skills(["python", "flask"], match="all")).scalars().all() == [job.id]
+    assert [s.name for s in db.session.get(JobSeeker, seeker.id).skill_set] == ["python"]
+
+    assert backfill_new_skill_tables(inspect(db.engine).get_table_names()) is None
@@ -0,0 +1,44 @@
+from app import db
+from app.auth.tokens import issue_access_token, revoke_tokens, version_cache
+from app.models import User
+
+
+def _user(role="job_seeker"):
+    user = User(name="User", email="user@example.com", password_hash="x", role=role, is_verified=True)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_version_read_before_the_revocation_commits_is_not_kept(app):
+    user = _user()
+    assert version_cache.get(user.id, ttl=30) == 0
+
+    revoke_tokens(user)
+    # A concurrent request looks the version up before the revocation commits
+    assert version_cache.get(user.id, ttl=30) == 0
+    db.session.commit()
+
+    assert version_cache.get(user.id, ttl=30) == 1
+
+
+def test_role_change_revokes_existing_tokens(app):
+    user = _user()
+    token = issue_access_token(user)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.post("/api/notifications/stream-token", headers=headers).status_code == 200
+
+    user = db.session.get(User, user.id)  # expired after the commit, like a fresh request would load it
+    user.role = "employer"
+    db.session.commit()
+
+    assert user.token_version == 1
+    assert client.post("/api/notifications/stream-token", headers=headers).status_code == 401
+
+
+def test_new_users_and_unchanged_roles_keep_their_version(app):
+    user = _user()
+    user.role = "job_seeker"
+    db.session.commit()
+    assert user.token_version == 0